@@ -0,0 +1,65 @@
+"""add hot lookup indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # UNIQUE 제약 전에 중복 session_id 확인 (데이터를 지우지 않고 중단, 정리는 별도 스크립트로)
+    duplicates = op.get_bind().execute(sa.text("""
+        SELECT count(*) AS sessions, coalesce(sum(row_count - 1), 0) AS extra_rows
+        FROM (
+            SELECT count(*) AS row_count FROM user_responses
+            GROUP BY session_id HAVING count(*) > 1
+        ) duplicated
+    """)).one()
+    if duplicates.sessions:
+        raise RuntimeError(
+            f"user_responses has {duplicates.sessions} session_ids with duplicate rows "
+            f"({duplicates.extra_rows} extra rows). Review and merge them with "
+            f"scripts/dedupe_user_responses.py --apply, then re-run the migration."
+        )
+
+    # CREATE INDEX CONCURRENTLY는 트랜잭션 밖에서 실행해야 함
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_user_responses_session_id', 'user_responses', ['session_id'],
+            unique=True, postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_user_responses_uid_created_at', 'user_responses', ['uid', sa.text('created_at DESC')],
+            unique=False, postgresql_concurrently=True
+        )
+        op.create_index(
+            op.f('ix_question_sessions_uid'), 'question_sessions', ['uid'],
+            unique=False, postgresql_concurrently=True
+        )
+        op.create_index(
+            op.f('ix_question_sessions_device_id'), 'question_sessions', ['device_id'],
+            unique=False, postgresql_concurrently=True
+        )
+
+    # 미리 만든 유니크 인덱스로 제약 추가 (테이블 스캔 없이 메타데이터만 변경)
+    op.execute(
+        "ALTER TABLE user_responses "
+        "ADD CONSTRAINT uq_user_responses_session_id UNIQUE USING INDEX uq_user_responses_session_id"
+    )
+
+
+def downgrade():
+    op.drop_constraint('uq_user_responses_session_id', 'user_responses', type_='unique')
+
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_question_sessions_device_id'), table_name='question_sessions', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_question_sessions_uid'), table_name='question_sessions', postgresql_concurrently=True)
+        op.drop_index('ix_user_responses_uid_created_at', table_name='user_responses', postgresql_concurrently=True)
@@ -0,0 +1,66 @@
+"""create analytics rollups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.analytics_triggers import ANALYTICS_ROLLUP_DDL, ANALYTICS_ROLLUP_DROP
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('analytics_counters',
+    sa.Column('metric', sa.String(length=50), nullable=False),
+    sa.Column('bucket', sa.String(length=255), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('metric', 'bucket')
+    )
+    op.create_table('analytics_user_refcounts',
+    sa.Column('uid', sa.String(length=255), nullable=False),
+    sa.Column('responses', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('uid')
+    )
+
+    # 기존 데이터로 초기 롤업 계산 (트리거 설치 전에 같은 트랜잭션에서 수행)
+    op.execute("LOCK TABLE user_responses IN SHARE MODE")
+    op.execute("""
+        INSERT INTO analytics_user_refcounts (uid, responses)
+        SELECT uid, count(*) FROM user_responses WHERE uid IS NOT NULL GROUP BY uid
+    """)
+    op.execute("""
+        INSERT INTO analytics_counters (metric, bucket, count)
+        SELECT metric, bucket, count(*) FROM (
+            SELECT 'age_group' AS metric, ((age / 10) * 10)::text AS bucket
+            FROM user_responses WHERE uid IS NOT NULL AND age > 0
+            UNION ALL
+            SELECT 'top_concern', top_concern
+            FROM user_responses WHERE uid IS NOT NULL AND top_concern <> ''
+            UNION ALL
+            SELECT f.field, e.value
+            FROM user_responses ur
+            CROSS JOIN unnest(ARRAY['period_concerns', 'body_concerns', 'skin_hair_concerns', 'mental_health_concerns']) AS f(field)
+            CROSS JOIN LATERAL jsonb_array_elements_text(
+                CASE WHEN jsonb_typeof(to_jsonb(ur)->f.field) = 'array' THEN to_jsonb(ur)->f.field ELSE '[]'::jsonb END
+            ) AS e(value)
+            WHERE ur.uid IS NOT NULL
+        ) contributions
+        GROUP BY metric, bucket
+        UNION ALL
+        SELECT 'total_users', '', count(*) FROM analytics_user_refcounts HAVING count(*) > 0
+    """)
+
+    op.execute(ANALYTICS_ROLLUP_DDL)
+
+
+def downgrade():
+    op.execute(ANALYTICS_ROLLUP_DROP)
+    op.drop_table('analytics_user_refcounts')
+    op.drop_table('analytics_counters')
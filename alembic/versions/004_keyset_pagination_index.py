@@ -0,0 +1,34 @@
+"""keyset pagination index for user responses
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # (uid, created_at DESC, id DESC): 키셋 조건 (created_at, id) < (:c, :i) 전체를 인덱스 조건으로 사용
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_responses_uid_created_at_id', 'user_responses',
+            ['uid', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False, postgresql_concurrently=True
+        )
+        op.drop_index('ix_user_responses_uid_created_at', table_name='user_responses', postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_responses_uid_created_at', 'user_responses', ['uid', sa.text('created_at DESC')],
+            unique=False, postgresql_concurrently=True
+        )
+        op.drop_index('ix_user_responses_uid_created_at_id', table_name='user_responses', postgresql_concurrently=True)
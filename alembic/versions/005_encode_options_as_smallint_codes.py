@@ -0,0 +1,153 @@
+"""encode multi-select options as smallint codes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+# 이 마이그레이션 시점의 라벨 <-> 코드 표 (app.core.option_registry에서 고정해 복사, 이후 레지스트리가 바뀌어도 그대로 둠)
+OPTION_CODES = {
+    "birth_control": {
+        1: "Hormonal Birth Control Pills", 2: "IUD (Intrauterine Device)"
+    },
+    "period_concerns": {
+        1: "Irregular Periods", 2: "Painful Periods", 3: "Light periods / Spotting", 4: "Heavy periods"
+    },
+    "body_concerns": {
+        1: "Bloating", 2: "Hot Flashes", 3: "Nausea",
+        4: "Difficulty losing weight / stubborn belly fat", 5: "Recent weight gain", 6: "Menstrual headaches"
+    },
+    "skin_hair_concerns": {
+        1: "Hirsutism (hair  growth on chin, nipples etc)", 2: "Thinning of hair", 3: "Adult Acne"
+    },
+    "mental_health_concerns": {
+        1: "Mood swings", 2: "Stress", 3: "Fatigue"
+    }
+}
+CODED_ARRAY_FIELDS = tuple(OPTION_CODES)
+
+# 변환 전 컬럼 타입 (birth_control은 text[], 나머지는 JSONB)
+ORIGINAL_TYPES = {
+    "birth_control": "VARCHAR[]",
+    "period_concerns": "JSONB",
+    "body_concerns": "JSONB",
+    "skin_hair_concerns": "JSONB",
+    "mental_health_concerns": "JSONB"
+}
+
+# 롤업 버킷을 라벨에서 코드로 바꿀 지표
+ROLLUP_METRICS = ("period_concerns", "body_concerns", "skin_hair_concerns", "mental_health_concerns")
+
+
+def _mapping(field):
+    """(라벨 목록, 같은 순서의 코드 목록)"""
+    codes = sorted(OPTION_CODES[field])
+    return [OPTION_CODES[field][code] for code in codes], codes
+
+
+def _labels_expression(field):
+    """기존 값을 text[] 라벨 배열로 (JSON null 등 배열이 아닌 값은 NULL)"""
+    if ORIGINAL_TYPES[field] == "JSONB":
+        return f"pg_temp.jsonb_labels({field})"
+    return f"{field}::text[]"
+
+
+def upgrade():
+    connection = op.get_bind()
+
+    # ALTER ... USING 에서는 서브쿼리를 쓸 수 없으므로 변환 함수 사용
+    op.execute("""
+        CREATE FUNCTION pg_temp.jsonb_labels(value jsonb) RETURNS text[]
+        LANGUAGE sql IMMUTABLE AS $$
+            SELECT CASE WHEN jsonb_typeof(value) = 'array'
+                THEN ARRAY(SELECT jsonb_array_elements_text(value)) END
+        $$
+    """)
+    op.execute("""
+        CREATE FUNCTION pg_temp.option_codes(labels text[], known text[], codes smallint[]) RETURNS smallint[]
+        LANGUAGE sql IMMUTABLE AS $$
+            SELECT CASE WHEN labels IS NULL THEN NULL ELSE coalesce(
+                (SELECT array_agg(codes[array_position(known, l.label)] ORDER BY l.ord)
+                 FROM unnest(labels) WITH ORDINALITY AS l(label, ord)),
+                '{}'::smallint[]
+            ) END
+        $$
+    """)
+
+    # 레지스트리에 없는 라벨이 있으면 데이터 손실 대신 중단
+    for field in CODED_ARRAY_FIELDS:
+        labels, _ = _mapping(field)
+        unknown = connection.execute(sa.text(f"""
+            SELECT DISTINCT l.label
+            FROM user_responses, unnest({_labels_expression(field)}) AS l(label)
+            WHERE NOT (l.label = ANY(CAST(:known AS text[])))
+        """), {"known": labels}).scalars().all()
+        if unknown:
+            raise Exception(f"{field} has values missing from the option registry: {unknown}")
+
+    # 컬럼마다 ALTER하면 테이블을 컬럼 수만큼 다시 쓰므로 한 문장으로 모든 컬럼을 변환 (재작성 1회)
+    params = {}
+    clauses = []
+    for field in CODED_ARRAY_FIELDS:
+        labels, codes = _mapping(field)
+        params.update({f"{field}_known": labels, f"{field}_codes": codes})
+        clauses.append(
+            f"ALTER COLUMN {field} TYPE SMALLINT[] USING pg_temp.option_codes("
+            f"{_labels_expression(field)}, CAST(:{field}_known AS text[]), CAST(:{field}_codes AS smallint[]))"
+        )
+    connection.execute(sa.text("ALTER TABLE user_responses " + ",\n    ".join(clauses)), params)
+
+    for field in ROLLUP_METRICS:
+        labels, codes = _mapping(field)
+        connection.execute(sa.text("""
+            UPDATE analytics_counters
+            SET bucket = (CAST(:codes AS smallint[]))[array_position(CAST(:known AS text[]), bucket)]::text
+            WHERE metric = :metric AND bucket = ANY(CAST(:known AS text[]))
+        """), {"known": labels, "codes": codes, "metric": field})
+
+    op.execute("DROP FUNCTION pg_temp.option_codes(text[], text[], smallint[])")
+    op.execute("DROP FUNCTION pg_temp.jsonb_labels(jsonb)")
+
+
+def downgrade():
+    connection = op.get_bind()
+
+    op.execute("""
+        CREATE FUNCTION pg_temp.option_labels(codes smallint[], known smallint[], labels text[]) RETURNS text[]
+        LANGUAGE sql IMMUTABLE AS $$
+            SELECT CASE WHEN codes IS NULL THEN NULL ELSE coalesce(
+                (SELECT array_agg(labels[array_position(known, c.code)] ORDER BY c.ord)
+                 FROM unnest(codes) WITH ORDINALITY AS c(code, ord)),
+                '{}'::text[]
+            ) END
+        $$
+    """)
+
+    params = {}
+    clauses = []
+    for field in CODED_ARRAY_FIELDS:
+        labels, codes = _mapping(field)
+        params.update({f"{field}_known": codes, f"{field}_labels": labels})
+        converted = f"pg_temp.option_labels({field}, CAST(:{field}_known AS smallint[]), CAST(:{field}_labels AS text[]))"
+        if ORIGINAL_TYPES[field] == "JSONB":
+            converted = f"to_jsonb({converted})"
+        clauses.append(f"ALTER COLUMN {field} TYPE {ORIGINAL_TYPES[field]} USING {converted}")
+    connection.execute(sa.text("ALTER TABLE user_responses " + ",\n    ".join(clauses)), params)
+
+    for field in ROLLUP_METRICS:
+        labels, codes = _mapping(field)
+        connection.execute(sa.text("""
+            UPDATE analytics_counters
+            SET bucket = (CAST(:labels AS text[]))[array_position(CAST(:known AS smallint[]), bucket::smallint)]
+            WHERE metric = :metric AND bucket ~ '^[0-9]+$'
+        """), {"known": codes, "labels": labels, "metric": field})
+
+    op.execute("DROP FUNCTION pg_temp.option_labels(smallint[], smallint[], text[])")
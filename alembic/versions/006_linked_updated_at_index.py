@@ -0,0 +1,28 @@
+"""index linked responses by updated_at
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 코호트 인덱스가 워터마크 이후 바뀐 연결 응답만 읽도록 (uid 없는 익명 응답은 제외)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_responses_linked_updated_at', 'user_responses', ['updated_at'],
+            unique=False, postgresql_concurrently=True, postgresql_where=sa.text('uid IS NOT NULL')
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_responses_linked_updated_at', table_name='user_responses', postgresql_concurrently=True)
@@ -0,0 +1,29 @@
+"""create analytics sketches
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 스케치 행은 첫 동기화(AnalyticsSketches.sync)가 전체 스캔으로 생성
+    op.create_table('analytics_sketches',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('synced_through', sa.DateTime(), nullable=False),
+    sa.Column('rebuilt_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('analytics_sketches')
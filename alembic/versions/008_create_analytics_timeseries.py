@@ -0,0 +1,51 @@
+"""create analytics timeseries
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.analytics_triggers import TIMESERIES_ROLLUP_DDL, TIMESERIES_ROLLUP_DROP
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('analytics_timeseries',
+    sa.Column('metric', sa.String(length=50), nullable=False),
+    sa.Column('granularity', sa.String(length=10), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('shard', sa.SmallInteger(), nullable=False, server_default='0'),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('metric', 'granularity', 'bucket_start', 'shard')
+    )
+
+    # 기존 데이터로 초기 구간 계산 (트리거 설치 전에 같은 트랜잭션에서 수행)
+    # 병합은 기록이 남아 있지 않으므로 이 시점부터 집계하고, 병합으로 삭제된 응답은 포함되지 않음
+    op.execute("LOCK TABLE question_sessions, user_responses IN SHARE MODE")
+    op.execute("""
+        INSERT INTO analytics_timeseries (metric, granularity, bucket_start, count)
+        SELECT e.metric, g.granularity, date_trunc(g.granularity, e.stamp), count(*)
+        FROM (
+            SELECT 'sessions_created' AS metric, created_at AS stamp FROM question_sessions
+            UNION ALL
+            SELECT 'sessions_linked', completed_at FROM question_sessions WHERE status = 'linked'
+            UNION ALL
+            SELECT 'responses_saved', created_at FROM user_responses
+        ) e
+        CROSS JOIN (VALUES ('hour'), ('day')) AS g(granularity)
+        WHERE e.stamp IS NOT NULL
+        GROUP BY 1, 2, 3
+    """)
+    op.execute(TIMESERIES_ROLLUP_DDL)
+
+
+def downgrade():
+    op.execute(TIMESERIES_ROLLUP_DROP)
+    op.drop_table('analytics_timeseries')
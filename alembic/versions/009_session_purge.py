@@ -0,0 +1,42 @@
+"""index abandoned sessions and create session archive
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 정리 작업(session_purge)이 보관하도록 설정된 경우에만 행이 쌓임 (보조 인덱스 없음)
+    op.create_table('question_sessions_archive',
+    sa.Column('session_id', sa.String(length=255), nullable=False),
+    sa.Column('uid', sa.String(length=255), nullable=True),
+    sa.Column('device_id', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('session_id')
+    )
+    
+    # 오래된 미완료 익명 세션만 created_at 순으로 찾도록 (연결/완료된 세션은 제외)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_question_sessions_abandoned_created_at', 'question_sessions', ['created_at'],
+            unique=False, postgresql_concurrently=True,
+            postgresql_where=sa.text("status = 'in_progress' AND uid IS NULL")
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_question_sessions_abandoned_created_at', table_name='question_sessions', postgresql_concurrently=True)
+    op.drop_table('question_sessions_archive')
@@ -0,0 +1,36 @@
+"""feed analytics sketches from a trigger-maintained change table
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.analytics_triggers import SKETCH_CHANGES_DDL, SKETCH_CHANGES_DROP
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('analytics_sketch_changes',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('uid', sa.String(length=255), nullable=False),
+    sa.Column('age', sa.Integer(), nullable=True),
+    sa.Column('sign', sa.SmallInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(SKETCH_CHANGES_DDL)
+    # updated_at 워터마크로 만든 기존 스케치는 큐와 이어지지 않으므로 비움 (첫 동기화가 전체 재구성)
+    op.execute("DELETE FROM analytics_sketches")
+
+
+def downgrade():
+    op.execute(SKETCH_CHANGES_DROP)
+    op.drop_table('analytics_sketch_changes')
+    # 이전 버전의 동기화는 age_removed 행을 모르므로 스케치를 비워 다시 구성하게 함
+    op.execute("DELETE FROM analytics_sketches")
@@ -0,0 +1,45 @@
+"""make user_responses.created_at NOT NULL for the keyset cursor
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 채우기와 검증은 각자 트랜잭션에서 커밋해 ACCESS EXCLUSIVE 잠금을 테이블 스캔 동안 잡지 않음
+    with op.get_context().autocommit_block():
+        # NULL created_at 행은 (created_at, id) 키셋 비교에서 빠지고 커서 인코딩도 실패하므로
+        # 수정 시각 → 세션 생성 시각 → 현재 시각 순으로 채움 (행 잠금만 사용)
+        op.execute("""
+            UPDATE user_responses AS r
+            SET created_at = coalesce(
+                r.updated_at,
+                (SELECT s.created_at FROM question_sessions AS s WHERE s.session_id = r.session_id),
+                timezone('UTC', now())
+            )
+            WHERE r.created_at IS NULL
+        """)
+        # NOT VALID 추가는 스캔 없이 짧은 ACCESS EXCLUSIVE, VALIDATE는 SHARE UPDATE EXCLUSIVE로 스캔 (쓰기와 동시 실행)
+        # 중간에 실패한 뒤 다시 실행해도 되도록 남은 제약을 먼저 지움
+        op.execute("ALTER TABLE user_responses DROP CONSTRAINT IF EXISTS ck_user_responses_created_at_not_null")
+        op.execute(
+            "ALTER TABLE user_responses ADD CONSTRAINT ck_user_responses_created_at_not_null "
+            "CHECK (created_at IS NOT NULL) NOT VALID"
+        )
+        op.execute("ALTER TABLE user_responses VALIDATE CONSTRAINT ck_user_responses_created_at_not_null")
+    # 검증된 CHECK 제약이 있으므로 SET NOT NULL은 테이블을 다시 훑지 않고 잠금도 짧게 끝남
+    op.alter_column('user_responses', 'created_at', existing_type=sa.DateTime(), nullable=False)
+    op.drop_constraint('ck_user_responses_created_at_not_null', 'user_responses', type_='check')
+
+
+def downgrade():
+    op.alter_column('user_responses', 'created_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,32 @@
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, AsyncReadSessionLocal, async_engine, read_async_engine, recent_writes
+from app.core.read_routing import LAST_WRITE_COOKIE, LAST_WRITE_HEADER, wrote_recently
+
+
+async def get_read_db(request: Request, response: Response):
+    """Create read-only async database session
+
+    Uses the read replica unless the client wrote within READ_YOUR_WRITES_SECONDS, in which
+    case the primary is used. Recent writes are detected from the last-write cookie/header the
+    client sends back (set by any worker) or from this worker's record of the session/user in the path.
+    """
+    path_params = request.path_params
+    use_primary = (
+        read_async_engine is async_engine
+        or wrote_recently(
+            request.cookies.get(LAST_WRITE_COOKIE) or request.headers.get(LAST_WRITE_HEADER),
+            settings.READ_YOUR_WRITES_SECONDS
+        )
+        or recent_writes.is_recent(session_id=path_params.get("session_id"), uid=path_params.get("uid"))
+    )
+    response.headers["X-Read-Source"] = "primary" if use_primary else "replica"
+
+    session_factory = AsyncSessionLocal if use_primary else AsyncReadSessionLocal
+    async with session_factory() as db:
+        try:
+            yield db
+        except Exception as e:
+            await db.rollback()
+            raise e
@@ -2,8 +2,9 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import Optional
-import firebase_admin
-from firebase_admin import auth
+from app.core.config import settings
+from app.core.token_cache import token_cache
+from app.core.token_verifier import token_verifier
 
 router = APIRouter()
 security = HTTPBearer()
@@ -25,7 +26,7 @@ class UserInfo(BaseModel):
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """Firebase ID 토큰으로 현재 사용자 정보 가져오기"""
     try:
-        decoded_token = auth.verify_id_token(credentials.credentials)
+        decoded_token = await token_verifier.verify(credentials.credentials)
         return decoded_token
     except Exception as e:
         raise HTTPException(
@@ -45,11 +46,21 @@ async def get_current_active_user(current_user: dict = Depends(get_current_user)
     return current_user
 
 
+async def get_current_admin_user(current_user: dict = Depends(get_current_active_user)) -> dict:
+    """관리자 사용자만 허용 (ADMIN_CLAIM custom claim이 true이거나 ADMIN_UIDS에 있는 UID)"""
+    if current_user.get(settings.ADMIN_CLAIM) is True or current_user.get("uid") in settings.ADMIN_UIDS:
+        return current_user
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="관리자 권한이 필요합니다."
+    )
+
+
 @router.post("/verify", response_model=UserInfo)
 async def verify_token(request: FirebaseTokenRequest):
     """Firebase ID 토큰 검증"""
     try:
-        decoded_token = auth.verify_id_token(request.id_token)
+        decoded_token = await token_verifier.verify(request.id_token)
         
         return UserInfo(
             uid=decoded_token.get("uid"),
@@ -79,6 +90,12 @@ async def get_current_user_info(current_user: dict = Depends(get_current_active_
     )
 
 
+@router.get("/token-cache/stats")
+async def get_token_cache_stats(current_user: dict = Depends(get_current_admin_user)):
+    """검증된 토큰 캐시 히트/미스 통계 (관리자 전용)"""
+    return {**token_cache.stats(), "public_keys": token_verifier.stats()}
+
+
 @router.post("/logout")
 async def logout():
     """사용자 로그아웃 (클라이언트에서 처리)"""
@@ -1,36 +1,54 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
-from app.services.question_service import QuestionService
+from fastapi import APIRouter, HTTPException, status, Depends, Response, Query, Path
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, List, Union
+from datetime import datetime, timedelta
+from pydantic import ValidationError
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.api.deps import get_read_db
+from app.services.question_service import AsyncQuestionService, RESPONSE_FIELDS, encode_response_cursor, decode_response_cursor
+from app.services.analytics_cache import analytics_cache, load_analytics, load_approximate_analytics
+from app.services.cohort_index import cohort_index
+from app.services.concern_matrix import concern_matrix_cache, load_concern_matrix
+from app.services.analytics_timeseries import AnalyticsTimeSeries, to_utc
+from app.services.response_export import get_encoder, stream_export
+from app.services.response_write_buffer import response_write_buffer
+from app.services.session_purge import session_purger
 from app.models.question_models import (
-    SessionCreate, SessionResponse, UserResponseCreate, 
-    UserResponseFull, SessionLinkRequest, AnalyticsResponse
+    SessionCreate, SessionResponse, UserResponseCreate, UserResponseData,
+    UserResponseFull, UserResponsePage, SessionLinkRequest, AnalyticsResponse,
+    ResponseFieldPatch, ResponseFieldUpdate,
+    BulkQuestionnaireItem, BulkIngestRequest, BulkIngestItemResult, BulkIngestResponse,
+    ConcernMatrixResponse, TimeSeriesResponse, CohortExpression, CohortCountResponse
 )
-from app.api.v1.endpoints.auth import get_current_active_user, get_current_user
+from app.api.v1.endpoints.auth import get_current_active_user, get_current_admin_user, get_current_user
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.database import create_tables
+from app.core.validators import QuestionValidators
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# 기존(12 hex)/시간순(32 hex) 세션 ID 형식 모두 허용
+SessionIdPath = Annotated[str, Path(pattern=QuestionValidators.SESSION_ID_PATTERN)]
+
 @router.post("/sessions", response_model=SessionResponse)
 async def create_session(
     session_data: SessionCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create new question session (available without login)"""
     try:
-        service = QuestionService(db)
+        service = AsyncQuestionService(db)
         # Non-logged in users can also create sessions
-        session_id = service.create_session(session_data.device_id, None)
+        session = await service.create_session(session_data.device_id, None)
         
-        # Return created session information
-        session = service.get_session(session_id)
+        # Return created session information (INSERT ... RETURNING)
         return SessionResponse(
             session_id=session.session_id,
             device_id=session.device_id,
@@ -43,38 +61,97 @@ async def create_session(
             detail=f"Session creation failed: {str(e)}"
         )
 
+@router.post("/sessions/bulk", response_model=BulkIngestResponse)
+async def bulk_ingest_questionnaires(
+    request: BulkIngestRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create many sessions with their responses in one transaction (offline replay, available without login)
+    
+    Each item is validated on its own; invalid items are reported and skipped,
+    valid ones are written together with one multi-row INSERT per table.
+    Items that carry a client-generated session_id are idempotent: a retried item
+    is reported as already_created instead of creating a second session.
+    """
+    if len(request.items) > settings.BULK_INGEST_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_INGEST_MAX_ITEMS} items per request"
+        )
+    
+    results: List[Optional[BulkIngestItemResult]] = [None] * len(request.items)
+    valid_items = []
+    for index, raw_item in enumerate(request.items):
+        try:
+            valid_items.append((index, BulkQuestionnaireItem(**raw_item)))
+        except ValidationError as e:
+            results[index] = BulkIngestItemResult(
+                index=index,
+                status="invalid",
+                errors=[f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()]
+            )
+    
+    try:
+        if valid_items:
+            service = AsyncQuestionService(db)
+            ingested = await service.ingest_questionnaires([item for _, item in valid_items])
+            for (index, _), (session_id, response_id, item_status) in zip(valid_items, ingested):
+                results[index] = BulkIngestItemResult(
+                    index=index, status=item_status, session_id=session_id, response_id=response_id,
+                    errors=["session_id already belongs to another device"] if item_status == "conflict" else None
+                )
+        
+        statuses = [result.status for result in results]
+        return BulkIngestResponse(
+            created=statuses.count("created"),
+            already_created=statuses.count("already_created"),
+            rejected=statuses.count("invalid") + statuses.count("conflict"),
+            results=results
+        )
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Bulk ingest failed: {str(e)}"
+        )
+
 @router.post("/sessions/{session_id}/responses", response_model=UserResponseFull)
 async def save_responses(
-    session_id: str,
+    session_id: SessionIdPath,
     response_data: UserResponseCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Save user responses (available without login)"""
     try:
         logger.info(f"답변 저장 요청 받음: session_id={session_id}")
         logger.info(f"요청 데이터: {response_data}")
         
-        service = QuestionService(db)
+        service = AsyncQuestionService(db)
         uid = None  # 로그인 없이도 답변 저장 가능
         
-        # Check if session exists
-        session = service.get_session(session_id)
-        if not session:
+        # Save responses (session existence is checked in the same statement)
+        if response_write_buffer.running:
+            # PATCH와 같은 큐를 거쳐 요청 순서대로 필드가 덮어써짐
+            # (그룹 커밋 모드가 아니면 flush 주기를 기다리지 않고 바로 커밋)
+            saved_response = await response_write_buffer.submit(
+                session_id,
+                response_data.responses,
+                uid,
+                flush_now=not settings.RESPONSE_WRITE_BUFFER_ENABLED
+            )
+        else:
+            saved_response = await service.save_user_responses(
+                session_id, 
+                response_data.responses, 
+                uid
+            )
+        if saved_response is None:
             logger.error(f"세션을 찾을 수 없음: {session_id}")
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Session not found"
             )
         
-        logger.info(f"세션 확인됨: {session.session_id}")
-        
-        # Save responses
-        saved_response = service.save_user_responses(
-            session_id, 
-            response_data.responses, 
-            uid
-        )
-        
         logger.info(f"답변 저장 성공: {saved_response.id}")
         return UserResponseFull.from_orm(saved_response)
         
@@ -87,16 +164,66 @@ async def save_responses(
             detail=f"Response save failed: {str(e)}"
         )
 
+@router.patch("/sessions/{session_id}/responses/{field}", response_model=ResponseFieldUpdate)
+async def update_response_field(
+    session_id: SessionIdPath,
+    field: str,
+    patch: ResponseFieldPatch,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Save the answer to a single question (available without login)
+    
+    Only the given field is validated (with the same QuestionValidators rule as a full save)
+    and only its column is written. A null value clears the answer.
+    """
+    try:
+        if field not in RESPONSE_FIELDS:
+            raise ValueError(f"Unknown question field: {field}")
+        # 다른 필드는 None이므로 이 필드의 검증기만 실행됨
+        value = getattr(UserResponseData(**{field: patch.value}), field)
+        
+        if response_write_buffer.running:
+            # 전체 저장과 같은 버퍼를 거치므로 같은 세션의 연속 수정은 한 번의 쓰기로 합쳐짐
+            saved_response = await response_write_buffer.submit_fields(session_id, {field: value})
+        else:
+            saved_response = await AsyncQuestionService(db).update_response_field(session_id, field, value)
+        if saved_response is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Session not found"
+            )
+        
+        return ResponseFieldUpdate(
+            session_id=session_id,
+            response_id=saved_response.id,
+            field=field,
+            value=getattr(saved_response, field),
+            updated_at=saved_response.updated_at
+        )
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Response field update failed: {str(e)}"
+        )
+
 @router.post("/sessions/{session_id}/link")
 async def link_session_to_user(
-    session_id: str,
+    session_id: SessionIdPath,
     link_data: SessionLinkRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """Link session to user"""
     try:
-        service = QuestionService(db)
+        service = AsyncQuestionService(db)
         
         # Check that only the user can link their own session
         if current_user.get("uid") != link_data.uid:
@@ -105,15 +232,9 @@ async def link_session_to_user(
                 detail="You can only link your own sessions"
             )
         
-        success = service.link_session_to_user(session_id, link_data.uid)
+        result = await service.link_session_to_user(session_id, link_data.uid)
         
-        if success:
-            return {"message": "Session linked successfully"}
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Session linking failed"
-            )
+        return {"message": "Session linked successfully", **result}
             
     except HTTPException:
         raise
@@ -123,13 +244,16 @@ async def link_session_to_user(
             detail=f"Session linking failed: {str(e)}"
         )
 
-@router.get("/users/{uid}/responses", response_model=List[UserResponseFull])
+@router.get("/users/{uid}/responses", response_model=Union[UserResponsePage, List[UserResponseFull]])
 async def get_user_responses(
     uid: str,
-    db: Session = Depends(get_db),
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    all_responses: bool = Query(False, alias="all", description="Return every response as a plain list (unpaginated)"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Get all user responses"""
+    """Get user responses, newest first (keyset pagination on created_at, id)"""
     try:
         # Check that only the user can view their own responses
         if current_user.get("uid") != uid:
@@ -138,10 +262,28 @@ async def get_user_responses(
                 detail="You can only view your own responses"
             )
         
-        service = QuestionService(db)
-        responses = service.get_user_responses(uid)
+        service = AsyncQuestionService(db)
+        
+        # Legacy unpaginated mode (explicit opt-in)
+        if all_responses:
+            responses = await service.get_user_responses(uid)
+            return [UserResponseFull.from_orm(response) for response in responses]
+        
+        try:
+            after = decode_response_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
+        responses, next_key = await service.get_user_responses_page(uid, limit, after)
         
-        return [UserResponseFull.from_orm(response) for response in responses]
+        return UserResponsePage(
+            items=[UserResponseFull.from_orm(response) for response in responses],
+            next_cursor=encode_response_cursor(*next_key) if next_key else None,
+            has_more=next_key is not None
+        )
         
     except HTTPException:
         raise
@@ -153,13 +295,13 @@ async def get_user_responses(
 
 @router.get("/sessions/{session_id}/responses", response_model=UserResponseFull)
 async def get_session_responses(
-    session_id: str,
-    db: Session = Depends(get_db)
+    session_id: SessionIdPath,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get session responses (available without login)"""
     try:
-        service = QuestionService(db)
-        response = service.get_session_responses(session_id)
+        service = AsyncQuestionService(db)
+        response = await service.get_session_responses(session_id)
         
         if not response:
             raise HTTPException(
@@ -181,7 +323,7 @@ async def get_session_responses(
 async def merge_user_sessions(
     uid: str,
     session_ids: List[str],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """Merge multiple sessions into one user"""
@@ -193,8 +335,17 @@ async def merge_user_sessions(
                 detail="You can only merge your own sessions"
             )
         
-        service = QuestionService(db)
-        success = service.merge_user_sessions(uid, session_ids)
+        try:
+            for session_id in session_ids:
+                QuestionValidators.validate_session_id(session_id)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
+        service = AsyncQuestionService(db)
+        success = await service.merge_user_sessions(uid, session_ids)
         
         if success:
             return {"message": "Sessions merged successfully"}
@@ -214,15 +365,20 @@ async def merge_user_sessions(
 
 @router.get("/analytics", response_model=AnalyticsResponse)
 async def get_analytics(
-    db: Session = Depends(get_db),
+    response: Response,
+    approximate: bool = Query(False, description="Serve total_users and age stats from HyperLogLog/t-digest sketches"),
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Get analytics data (admin only)"""
+    """Get analytics data (admin only, served from a per-worker TTL cache)"""
     try:
         # TODO: Add admin permission check logic
-        service = QuestionService(db)
-        analytics_data = service.get_analytics()
+        if approximate:
+            return AnalyticsResponse(**await load_approximate_analytics())
         
+        analytics_data, cache_age, cache_state = await analytics_cache.get(load_analytics)
+        
+        response.headers["Age"] = str(int(cache_age))
+        response.headers["X-Cache"] = cache_state
         return AnalyticsResponse(**analytics_data)
         
     except Exception as e:
@@ -231,6 +387,158 @@ async def get_analytics(
             detail=f"Analytics data retrieval failed: {str(e)}"
         )
 
+@router.get("/analytics/cache-stats")
+async def get_analytics_cache_stats(
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Analytics cache hit/miss and refresh statistics (per worker)"""
+    return analytics_cache.stats()
+
+@router.get("/analytics/timeseries", response_model=TimeSeriesResponse)
+async def get_analytics_timeseries(
+    start: Optional[datetime] = Query(None, description="Range start (UTC, inclusive; default: 30 days before end)"),
+    end: Optional[datetime] = Query(None, description="Range end (UTC, exclusive; default: now)"),
+    bucket: str = Query("day", pattern="^(hour|day|week|month)$"),
+    metrics: Optional[List[str]] = Query(None, description="sessions_created, responses_saved, sessions_linked, merges (default: all)"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """Sessions created, responses saved, sessions linked and merges per hour/day/week/month (admin only)
+    
+    Served from hourly/daily rollups, so the cost depends on the number of buckets, not on raw rows.
+    """
+    try:
+        end = to_utc(end) if end else datetime.utcnow()
+        start = to_utc(start) if start else end - timedelta(days=30)
+        result = await db.run_sync(
+            lambda session: AnalyticsTimeSeries(session).query(start, end, bucket, metrics)
+        )
+        return TimeSeriesResponse(**result)
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Timeseries retrieval failed: {str(e)}"
+        )
+
+@router.get("/analytics/concern-matrix", response_model=ConcernMatrixResponse)
+async def get_concern_matrix(
+    response: Response,
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """Pairwise co-occurrence counts and lift between concern options (admin only, cached per worker)"""
+    try:
+        matrix, cache_age, cache_state = await concern_matrix_cache.get(load_concern_matrix)
+        
+        response.headers["Age"] = str(int(cache_age))
+        response.headers["X-Cache"] = cache_state
+        return ConcernMatrixResponse(**matrix)
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Concern matrix retrieval failed: {str(e)}"
+        )
+
+@router.get("/export")
+async def export_responses(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|parquet)$"),
+    start: Optional[datetime] = Query(None, description="Response created_at lower bound (UTC, inclusive)"),
+    end: Optional[datetime] = Query(None, description="Response created_at upper bound (UTC, exclusive)"),
+    linked_only: bool = Query(False, description="Only responses linked to a user"),
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """Stream all user responses joined with their sessions (admin only)
+    
+    Rows are read from a server-side cursor in batches and written out chunk by chunk
+    (one Parquet row group per batch), so memory use does not grow with the table.
+    """
+    try:
+        encoder = get_encoder(format)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    filename = f"user_responses_{datetime.utcnow():%Y%m%dT%H%M%S}.{encoder.extension}"
+    return StreamingResponse(
+        stream_export(
+            encoder,
+            start=to_utc(start) if start else None,
+            end=to_utc(end) if end else None,
+            linked_only=linked_only
+        ),
+        media_type=encoder.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/cohorts/count", response_model=CohortCountResponse)
+async def count_cohort(
+    expression: CohortExpression,
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """Count linked users matching an AND/OR/NOT expression over option values (admin only)
+    
+    Example: {"and": [{"field": "diagnosed_conditions", "value": "PCOS"},
+                      {"field": "body_concerns", "value": "Bloating"},
+                      {"not": {"field": "mental_health_concerns", "value": "Mood swings"}}]}
+    """
+    try:
+        result = await cohort_index.count(expression.model_dump(by_alias=True, exclude_none=True))
+        return CohortCountResponse(**result)
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Cohort count failed: {str(e)}"
+        )
+
+@router.get("/cohorts/stats")
+async def get_cohort_index_stats(
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Cohort bitmap index size and sync state (per worker)"""
+    return cohort_index.stats()
+
+@router.get("/write-buffer/stats")
+async def get_write_buffer_stats(
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Response write buffer batch sizes and flush latency (per worker)"""
+    return response_write_buffer.stats()
+
+@router.post("/maintenance/purge-sessions")
+async def purge_abandoned_sessions(
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """Delete (or archive) abandoned in_progress sessions now (admin only)"""
+    try:
+        return await session_purger.run_once()
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Session purge failed: {str(e)}"
+        )
+
+@router.get("/maintenance/purge-sessions/stats")
+async def get_session_purge_stats(
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Abandoned session purge runs and rows purged (per worker)"""
+    return session_purger.stats()
+
 @router.post("/init-database")
 async def initialize_database():
     """데이터베이스 테이블 생성 (개발용)"""
@@ -0,0 +1,230 @@
+"""분석 롤업/스케치 트리거 DDL
+
+create_tables()(database.py)와 alembic 마이그레이션이 모두 이 상수를 실행하므로 두 경로의 트리거가 어긋나지 않습니다.
+마이그레이션에 포함되어 배포된 뒤 함수를 바꿀 때는 상수를 고치고 그 상수를 다시 실행하는 새 마이그레이션을 추가합니다
+(CREATE OR REPLACE / DROP TRIGGER IF EXISTS로 작성되어 있어 다시 실행해도 안전).
+"""
+
+# 시계열 카운터 행을 나누는 샤드 수 (같은 구간에 동시에 쓰는 트랜잭션이 한 행을 두고 기다리지 않도록)
+TIMESERIES_SHARDS = 8
+
+# user_responses 변경분(OLD/NEW 전이 테이블)으로 롤업을 증감하는 문장 단위 트리거
+ANALYTICS_ROLLUP_DDL = """
+CREATE OR REPLACE FUNCTION analytics_rollup_apply(old_rows jsonb, new_rows jsonb) RETURNS void
+LANGUAGE plpgsql AS $$
+DECLARE
+    users_delta bigint;
+BEGIN
+    -- 연결된 사용자별 응답 수 갱신, 0 <-> 1 이상 전환으로 total_users 증감
+    WITH changes AS (
+        SELECT r, 1 AS sign FROM jsonb_array_elements(new_rows) r
+        UNION ALL
+        SELECT r, -1 AS sign FROM jsonb_array_elements(old_rows) r
+    ), deltas AS (
+        SELECT r->>'uid' AS uid, sum(sign) AS delta
+        FROM changes GROUP BY r->>'uid' HAVING sum(sign) <> 0
+    ), updated AS (
+        INSERT INTO analytics_user_refcounts AS rc (uid, responses)
+        SELECT uid, delta FROM deltas ORDER BY uid
+        ON CONFLICT (uid) DO UPDATE SET responses = rc.responses + excluded.responses
+        RETURNING rc.uid, rc.responses
+    )
+    SELECT coalesce(sum(CASE
+        WHEN u.responses > 0 AND u.responses - d.delta <= 0 THEN 1
+        WHEN u.responses <= 0 AND u.responses - d.delta > 0 THEN -1
+        ELSE 0 END), 0)
+    INTO users_delta
+    FROM updated u JOIN deltas d ON d.uid = u.uid;
+
+    DELETE FROM analytics_user_refcounts
+    WHERE responses <= 0 AND uid IN (SELECT r->>'uid' FROM jsonb_array_elements(old_rows) r);
+
+    -- 행별 기여분(+1/-1)을 (metric, bucket)으로 합산해 한 번에 반영
+    WITH changes AS (
+        SELECT r, 1 AS sign FROM jsonb_array_elements(new_rows) r
+        UNION ALL
+        SELECT r, -1 AS sign FROM jsonb_array_elements(old_rows) r
+    ), contributions AS (
+        SELECT 'total_users' AS metric, '' AS bucket, users_delta AS sign WHERE users_delta <> 0
+        UNION ALL
+        SELECT 'age_group', (((r->>'age')::int / 10) * 10)::text, sign
+        FROM changes WHERE (r->>'age')::int > 0
+        UNION ALL
+        SELECT 'top_concern', r->>'top_concern', sign
+        FROM changes WHERE coalesce(r->>'top_concern', '') <> ''
+        UNION ALL
+        SELECT f.field, e.value, c.sign
+        FROM changes c
+        CROSS JOIN unnest(ARRAY['period_concerns', 'body_concerns', 'skin_hair_concerns', 'mental_health_concerns']) AS f(field)
+        CROSS JOIN LATERAL jsonb_array_elements_text(
+            CASE WHEN jsonb_typeof(c.r->f.field) = 'array' THEN c.r->f.field ELSE '[]'::jsonb END
+        ) AS e(value)
+    )
+    INSERT INTO analytics_counters AS ac (metric, bucket, count)
+    SELECT metric, bucket, sum(sign) FROM contributions
+    GROUP BY metric, bucket HAVING sum(sign) <> 0
+    ORDER BY metric, bucket
+    ON CONFLICT (metric, bucket) DO UPDATE SET count = ac.count + excluded.count;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION analytics_rollup_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    old_json jsonb := '[]'::jsonb;
+    new_json jsonb := '[]'::jsonb;
+BEGIN
+    -- 연결되지 않은(uid 없는) 응답은 분석 대상이 아니므로 제외
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT coalesce(jsonb_agg(to_jsonb(o)), '[]'::jsonb) INTO old_json FROM old_rows o WHERE o.uid IS NOT NULL;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT coalesce(jsonb_agg(to_jsonb(n)), '[]'::jsonb) INTO new_json FROM new_rows n WHERE n.uid IS NOT NULL;
+    END IF;
+    IF old_json <> '[]'::jsonb OR new_json <> '[]'::jsonb THEN
+        PERFORM analytics_rollup_apply(old_json, new_json);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS analytics_rollup_insert ON user_responses;
+CREATE TRIGGER analytics_rollup_insert AFTER INSERT ON user_responses
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION analytics_rollup_trigger();
+
+DROP TRIGGER IF EXISTS analytics_rollup_update ON user_responses;
+CREATE TRIGGER analytics_rollup_update AFTER UPDATE ON user_responses
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION analytics_rollup_trigger();
+
+DROP TRIGGER IF EXISTS analytics_rollup_delete ON user_responses;
+CREATE TRIGGER analytics_rollup_delete AFTER DELETE ON user_responses
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION analytics_rollup_trigger();
+"""
+
+# 세션 생성/연결, 응답 생성 시각을 시간/일 단위 구간으로 증가시키는 문장 단위 트리거
+# 구간마다 TIMESERIES_SHARDS개 행에 나눠 더하고(백엔드 PID로 선택) 조회할 때 합산
+TIMESERIES_ROLLUP_DDL = """
+CREATE OR REPLACE FUNCTION analytics_timeseries_add(p_metric text, stamps timestamp[]) RETURNS void
+LANGUAGE sql AS $$
+    INSERT INTO analytics_timeseries AS t (metric, granularity, bucket_start, shard, count)
+    SELECT p_metric, g.granularity, date_trunc(g.granularity, s.stamp), mod(pg_backend_pid(), {shards}), count(*)
+    FROM unnest(stamps) AS s(stamp)
+    CROSS JOIN (VALUES ('hour'), ('day')) AS g(granularity)
+    WHERE s.stamp IS NOT NULL
+    GROUP BY 2, 3
+    ORDER BY 2, 3
+    ON CONFLICT (metric, granularity, bucket_start, shard) DO UPDATE SET count = t.count + excluded.count;
+$$;
+
+CREATE OR REPLACE FUNCTION analytics_timeseries_sessions_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM analytics_timeseries_add('sessions_created', ARRAY(SELECT created_at FROM new_rows));
+    ELSE
+        -- 연결 상태로 바뀐 세션만 (이미 연결된 세션의 재연결은 제외)
+        PERFORM analytics_timeseries_add('sessions_linked', ARRAY(
+            SELECT coalesce(n.completed_at, timezone('UTC', now()))
+            FROM new_rows n JOIN old_rows o ON o.session_id = n.session_id
+            WHERE n.status = 'linked' AND o.status IS DISTINCT FROM 'linked'
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION analytics_timeseries_responses_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    -- INSERT ... ON CONFLICT DO UPDATE로 갱신된 행은 new_rows에 포함되지 않음 (세션당 첫 저장만 집계)
+    PERFORM analytics_timeseries_add('responses_saved', ARRAY(SELECT created_at FROM new_rows));
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS analytics_timeseries_insert ON question_sessions;
+CREATE TRIGGER analytics_timeseries_insert AFTER INSERT ON question_sessions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION analytics_timeseries_sessions_trigger();
+
+DROP TRIGGER IF EXISTS analytics_timeseries_update ON question_sessions;
+CREATE TRIGGER analytics_timeseries_update AFTER UPDATE ON question_sessions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION analytics_timeseries_sessions_trigger();
+
+DROP TRIGGER IF EXISTS analytics_timeseries_insert ON user_responses;
+CREATE TRIGGER analytics_timeseries_insert AFTER INSERT ON user_responses
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION analytics_timeseries_responses_trigger();
+""".format(shards=TIMESERIES_SHARDS)
+
+# 연결된 응답의 uid/나이 변경을 analytics_sketch_changes에 쌓는 문장 단위 트리거
+SKETCH_CHANGES_DDL = """
+CREATE OR REPLACE FUNCTION analytics_sketch_changes_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO analytics_sketch_changes (uid, age, sign)
+        SELECT uid, age, 1 FROM new_rows WHERE uid IS NOT NULL;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO analytics_sketch_changes (uid, age, sign)
+        SELECT uid, age, -1 FROM old_rows WHERE uid IS NOT NULL AND age > 0;
+    ELSE
+        -- uid나 나이가 바뀐 행만 (이전 나이는 빼고 새 값은 더함, 같은 값으로 재저장하면 기록 없음)
+        INSERT INTO analytics_sketch_changes (uid, age, sign)
+        SELECT o.uid, o.age, -1
+        FROM old_rows o JOIN new_rows n ON n.id = o.id
+        WHERE o.uid IS NOT NULL AND o.age > 0
+          AND (n.uid IS DISTINCT FROM o.uid OR n.age IS DISTINCT FROM o.age)
+        UNION ALL
+        SELECT n.uid, n.age, 1
+        FROM new_rows n JOIN old_rows o ON o.id = n.id
+        WHERE n.uid IS NOT NULL
+          AND (n.uid IS DISTINCT FROM o.uid OR n.age IS DISTINCT FROM o.age);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS analytics_sketch_changes_insert ON user_responses;
+CREATE TRIGGER analytics_sketch_changes_insert AFTER INSERT ON user_responses
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION analytics_sketch_changes_trigger();
+
+DROP TRIGGER IF EXISTS analytics_sketch_changes_update ON user_responses;
+CREATE TRIGGER analytics_sketch_changes_update AFTER UPDATE ON user_responses
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION analytics_sketch_changes_trigger();
+
+DROP TRIGGER IF EXISTS analytics_sketch_changes_delete ON user_responses;
+CREATE TRIGGER analytics_sketch_changes_delete AFTER DELETE ON user_responses
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION analytics_sketch_changes_trigger();
+"""
+
+ANALYTICS_ROLLUP_DROP = """
+DROP TRIGGER IF EXISTS analytics_rollup_delete ON user_responses;
+DROP TRIGGER IF EXISTS analytics_rollup_update ON user_responses;
+DROP TRIGGER IF EXISTS analytics_rollup_insert ON user_responses;
+DROP FUNCTION IF EXISTS analytics_rollup_trigger();
+DROP FUNCTION IF EXISTS analytics_rollup_apply(jsonb, jsonb);
+"""
+
+TIMESERIES_ROLLUP_DROP = """
+DROP TRIGGER IF EXISTS analytics_timeseries_insert ON user_responses;
+DROP TRIGGER IF EXISTS analytics_timeseries_update ON question_sessions;
+DROP TRIGGER IF EXISTS analytics_timeseries_insert ON question_sessions;
+DROP FUNCTION IF EXISTS analytics_timeseries_responses_trigger();
+DROP FUNCTION IF EXISTS analytics_timeseries_sessions_trigger();
+DROP FUNCTION IF EXISTS analytics_timeseries_add(text, timestamp[]);
+"""
+
+SKETCH_CHANGES_DROP = """
+DROP TRIGGER IF EXISTS analytics_sketch_changes_insert ON user_responses;
+DROP TRIGGER IF EXISTS analytics_sketch_changes_update ON user_responses;
+DROP TRIGGER IF EXISTS analytics_sketch_changes_delete ON user_responses;
+DROP FUNCTION IF EXISTS analytics_sketch_changes_trigger();
+"""
@@ -1,32 +1,147 @@
-from sqlalchemy import create_engine, Column, String, Integer, DateTime, Text, ARRAY, JSON
+from sqlalchemy import create_engine, Column, String, Integer, SmallInteger, BigInteger, DateTime, LargeBinary, Text, ARRAY, JSON, Index, UniqueConstraint, DDL, TypeDecorator, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 from app.core.config import settings
-import uuid
+from app.core.pool_metrics import instrumented_pool_class, pool_status
+from app.core.read_routing import RecentWrites
+from app.core.analytics_triggers import ANALYTICS_ROLLUP_DDL, TIMESERIES_ROLLUP_DDL, SKETCH_CHANGES_DDL
+from app.core.option_registry import OPTION_REGISTRY
+from typing import Any, Dict
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
 
 # Database engine creation
+database_url = settings.DATABASE_URL
 # Render PostgreSQL requires SSL
-if settings.ENVIRONMENT == "production":
-    # For Render with Session Pooler, optimize settings
-    database_url = settings.DATABASE_URL
-    if "?" not in database_url:
-        database_url += "?sslmode=require"
-    
-    # Session Pooler에 최적화된 설정
-    engine = create_engine(
-        database_url,
-        pool_size=5,           # Session Pooler가 관리하므로 작게 설정
-        max_overflow=10,       # 적절한 오버플로우
-        pool_pre_ping=False,   # Session Pooler가 관리하므로 비활성화
-        pool_recycle=300,      # 5분마다 연결 재생성
-        echo=False             # 프로덕션에서는 SQL 로그 비활성화
+if settings.ENVIRONMENT == "production" and "?" not in database_url:
+    database_url += "?sslmode=require"
+
+
+def derive_pool_sizes(max_connections: int, workers: int, sync_pool_size: int) -> Dict[str, int]:
+    """전체 커넥션 예산을 워커 수로 나눠 워커별 풀 크기 계산
+
+    워커 몫에서 동기 엔진 몫을 뺀 나머지를 비동기 엔진에 주고, 그중 2/3을 상시 유지하고
+    나머지는 overflow로 둡니다. 모든 워커가 overflow까지 채워도 예산을 넘지 않습니다.
+    워커 몫이 동기 엔진 몫 + 비동기 커넥션 1개보다 작으면 예산을 넘기는 대신 ValueError를 냅니다.
+    """
+    per_worker = max_connections // max(workers, 1)
+    if per_worker < sync_pool_size + 1:
+        raise ValueError(
+            f"DB_MAX_CONNECTIONS={max_connections} leaves {per_worker} connections per worker for "
+            f"WEB_CONCURRENCY={workers}, but each worker needs DB_SYNC_POOL_SIZE={sync_pool_size} + 1; "
+            f"raise DB_MAX_CONNECTIONS to at least {(sync_pool_size + 1) * max(workers, 1)} or lower the others"
+        )
+    async_budget = per_worker - sync_pool_size
+    pool_size = max(async_budget * 2 // 3, 1)
+    return {"pool_size": pool_size, "max_overflow": async_budget - pool_size, "sync_pool_size": sync_pool_size}
+
+
+pool_sizes = derive_pool_sizes(settings.DB_MAX_CONNECTIONS, settings.WEB_CONCURRENCY, settings.DB_SYNC_POOL_SIZE)
+if settings.DB_POOL_SIZE is not None:
+    pool_sizes["pool_size"] = settings.DB_POOL_SIZE
+if settings.DB_MAX_OVERFLOW is not None:
+    pool_sizes["max_overflow"] = settings.DB_MAX_OVERFLOW
+# 직접 지정한 풀 크기는 그대로 쓰되 예산을 넘으면 알림
+worker_connections = pool_sizes["pool_size"] + pool_sizes["max_overflow"] + pool_sizes["sync_pool_size"]
+if worker_connections * max(settings.WEB_CONCURRENCY, 1) > settings.DB_MAX_CONNECTIONS:
+    logger.error(
+        f"DB_POOL_SIZE/DB_MAX_OVERFLOW allow {worker_connections} connections per worker x {settings.WEB_CONCURRENCY} workers, "
+        f"above DB_MAX_CONNECTIONS={settings.DB_MAX_CONNECTIONS}"
     )
-else:
-    engine = create_engine(settings.DATABASE_URL)
+
+engine = create_engine(
+    database_url,
+    poolclass=instrumented_pool_class(QueuePool, "sync"),
+    pool_size=pool_sizes["sync_pool_size"],
+    max_overflow=0,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    echo=False
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def to_async_database_url(url: str):
+    """동기 DATABASE_URL을 asyncpg 드라이버 URL로 변환"""
+    async_url = make_url(url)
+    query = dict(async_url.query)
+    # asyncpg는 sslmode 대신 ssl 파라미터를 사용
+    sslmode = query.pop("sslmode", None)
+    if sslmode:
+        query["ssl"] = sslmode
+    return async_url.set(drivername="postgresql+asyncpg", query=query)
+
+
+# Async engine (이벤트 루프를 막지 않는 데이터 경로, 요청 트래픽 대부분이 사용)
+async_engine = create_async_engine(
+    to_async_database_url(database_url),
+    poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, "async"),
+    pool_size=pool_sizes["pool_size"],
+    max_overflow=pool_sizes["max_overflow"],
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    echo=False
+)
+# 커밋 후 lazy load가 일어나지 않도록 expire_on_commit 비활성화
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Read replica engine (DATABASE_READ_URL이 없으면 primary 엔진을 그대로 사용)
+if settings.DATABASE_READ_URL:
+    database_read_url = settings.DATABASE_READ_URL
+    if settings.ENVIRONMENT == "production" and "?" not in database_read_url:
+        database_read_url += "?sslmode=require"
+
+    # 백그라운드 스레드의 대량 읽기(분석 계산, 인덱스 구성)용 동기 엔진
+    read_engine = create_engine(
+        database_read_url,
+        poolclass=instrumented_pool_class(QueuePool, "sync_read"),
+        pool_size=pool_sizes["sync_pool_size"],
+        max_overflow=0,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        echo=False
+    )
+    read_async_engine = create_async_engine(
+        to_async_database_url(database_read_url),
+        poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, "async_read"),
+        pool_size=pool_sizes["pool_size"],
+        max_overflow=pool_sizes["max_overflow"],
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        echo=False
+    )
+else:
+    read_engine = engine
+    read_async_engine = async_engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AsyncReadSessionLocal = async_sessionmaker(read_async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+def run_with_session(session_factory, fn, *args):
+    """새 동기 세션으로 fn(db, *args) 실행
+
+    CPU를 많이 쓰는 백그라운드 계산을 asyncio.to_thread로 워커 스레드에서 돌릴 때 사용합니다.
+    AsyncSession.run_sync는 같은 작업을 이벤트 루프 스레드에서 실행하므로 그동안 모든 요청이 멈춥니다.
+    """
+    with session_factory() as db:
+        return fn(db, *args)
+
+# 세션/사용자별 최근 쓰기 기록 (쓰기 직후 읽기는 복제 지연을 피해 primary로)
+recent_writes = RecentWrites(window=settings.READ_YOUR_WRITES_SECONDS)
+
 Base = declarative_base()
 
 def get_db():
@@ -40,9 +155,76 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Create async database session"""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+def get_pool_stats() -> Dict[str, Any]:
+    """워커의 동기/비동기 커넥션 풀 상태"""
+    return {
+        "workers": settings.WEB_CONCURRENCY,
+        "max_connections": settings.DB_MAX_CONNECTIONS,
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine),
+        "async_read": pool_status(read_async_engine.sync_engine) if read_async_engine is not async_engine else None,
+        "sync_read": pool_status(read_engine) if read_engine is not engine else None
+    }
+
+SESSION_ID_PREFIX = "session_"
+_session_id_lock = threading.Lock()
+_session_id_last_ms = 0
+_session_id_sequence = 0
+
 def generate_session_id():
-    """Generate session ID"""
-    return f"session_{uuid.uuid4().hex[:12]}"
+    """Generate time-ordered session ID
+
+    session_ + UUIDv7 layout in 32 hex chars: 48-bit unix ms timestamp, version,
+    12-bit per-process sequence, variant and 62 random bits. IDs sort by creation time,
+    so new rows land at the right edge of the session_id indexes instead of random pages.
+    """
+    global _session_id_last_ms, _session_id_sequence
+    with _session_id_lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _session_id_last_ms:
+            _session_id_last_ms = now_ms
+            _session_id_sequence = 0
+        else:
+            # 같은 ms(또는 시계가 뒤로 간 경우)에는 순번 증가, 순번이 넘치면 다음 ms를 미리 사용
+            _session_id_sequence += 1
+            if _session_id_sequence > 0xFFF:
+                _session_id_last_ms += 1
+                _session_id_sequence = 0
+        timestamp_ms, sequence = _session_id_last_ms, _session_id_sequence
+
+    value = (timestamp_ms & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76
+    value |= sequence << 64
+    value |= 0b10 << 62
+    value |= int.from_bytes(os.urandom(8), "big") & 0x3FFFFFFFFFFFFFFF
+    return f"{SESSION_ID_PREFIX}{value:032x}"
+
+class OptionCodes(TypeDecorator):
+    """다중 선택 옵션을 smallint[] 코드 배열로 저장하는 컬럼 타입
+
+    파이썬 쪽 값은 라벨 목록 그대로이고, DB에는 option_registry의 정수 코드로 저장됩니다.
+    """
+    impl = ARRAY(SmallInteger)
+    cache_ok = True
+
+    def __init__(self, field: str):
+        super().__init__()
+        self.field = field
+
+    def process_bind_param(self, value, dialect):
+        return OPTION_REGISTRY[self.field].encode(value)
+
+    def process_result_value(self, value, dialect):
+        return OPTION_REGISTRY[self.field].decode(value)
 
 # Model definitions
 class User(Base):
@@ -58,14 +240,35 @@ class QuestionSession(Base):
     __tablename__ = "question_sessions"
     
     session_id = Column(String(255), primary_key=True)
-    uid = Column(String(255), nullable=True)
-    device_id = Column(String(255))
+    uid = Column(String(255), nullable=True, index=True)
+    device_id = Column(String(255), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
     status = Column(String(50), default="in_progress")
 
+# 오래된 미완료 익명 세션 정리(session_purge) 대상 조회용 (연결/완료된 세션은 제외)
+Index(
+    "ix_question_sessions_abandoned_created_at", QuestionSession.created_at,
+    postgresql_where=(QuestionSession.status == "in_progress") & QuestionSession.uid.is_(None)
+)
+
+class QuestionSessionArchive(Base):
+    """정리된 미완료 익명 세션 보관 (SESSION_PURGE_ARCHIVE=true일 때만 사용)"""
+    __tablename__ = "question_sessions_archive"
+    
+    session_id = Column(String(255), primary_key=True)
+    uid = Column(String(255), nullable=True)
+    device_id = Column(String(255))
+    created_at = Column(DateTime)
+    completed_at = Column(DateTime, nullable=True)
+    status = Column(String(50))
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
 class UserResponse(Base):
     __tablename__ = "user_responses"
+    __table_args__ = (
+        UniqueConstraint("session_id", name="uq_user_responses_session_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String(255))
@@ -77,17 +280,17 @@ class UserResponse(Base):
     
     # Menstrual related
     period_description = Column(String(100), nullable=True)
-    birth_control = Column(ARRAY(String), nullable=True)
+    birth_control = Column(OptionCodes("birth_control"), nullable=True)
     
     # Menstrual details
     last_period_date = Column(String(50), nullable=True)  # MM/DD/YYYY format
     cycle_length = Column(String(50), nullable=True)
     
-    # Health concerns (stored as JSONB)
-    period_concerns = Column(JSONB, nullable=True)
-    body_concerns = Column(JSONB, nullable=True)
-    skin_hair_concerns = Column(JSONB, nullable=True)
-    mental_health_concerns = Column(JSONB, nullable=True)
+    # Health concerns (option codes as smallint[], free-text other_concerns as JSONB)
+    period_concerns = Column(OptionCodes("period_concerns"), nullable=True)
+    body_concerns = Column(OptionCodes("body_concerns"), nullable=True)
+    skin_hair_concerns = Column(OptionCodes("skin_hair_concerns"), nullable=True)
+    mental_health_concerns = Column(OptionCodes("mental_health_concerns"), nullable=True)
     other_concerns = Column(JSONB, nullable=True)
     
     # Top priority concern
@@ -96,9 +299,62 @@ class UserResponse(Base):
     # Diagnosed conditions
     diagnosed_conditions = Column(ARRAY(String), nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # 키셋 커서 (created_at, id)의 일부라 NULL 불가
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+# 사용자별 최신순 응답 조회 및 (created_at, id) 키셋 페이지네이션용 복합 인덱스
+Index("ix_user_responses_uid_created_at_id", UserResponse.uid, UserResponse.created_at.desc(), UserResponse.id.desc())
+# 연결된 응답의 변경분 조회용 (코호트 인덱스 증분 동기화)
+Index("ix_user_responses_linked_updated_at", UserResponse.updated_at, postgresql_where=UserResponse.uid.isnot(None))
+
+class AnalyticsCounter(Base):
+    """분석 집계 롤업 (user_responses 트리거가 같은 트랜잭션에서 증감)"""
+    __tablename__ = "analytics_counters"
+    
+    metric = Column(String(50), primary_key=True)    # age_group, period_concerns, top_concern, total_users ...
+    bucket = Column(String(255), primary_key=True)   # 나이 구간, 옵션 코드/값 ('' for scalar metrics)
+    count = Column(BigInteger, nullable=False, default=0)
+
+class AnalyticsUserRefcount(Base):
+    """연결된 사용자별 응답 수 (total_users 증감 판단용)"""
+    __tablename__ = "analytics_user_refcounts"
+    
+    uid = Column(String(255), primary_key=True)
+    responses = Column(Integer, nullable=False, default=0)
+
+class AnalyticsSketch(Base):
+    """근사 분석용 스케치 (HyperLogLog / t-digest 직렬화, 워커가 증분을 병합해 갱신)"""
+    __tablename__ = "analytics_sketches"
+    
+    name = Column(String(50), primary_key=True)      # linked_uids, age
+    data = Column(LargeBinary, nullable=False)
+    synced_through = Column(DateTime, nullable=False)  # 마지막으로 변경 행을 병합한 시각
+    rebuilt_at = Column(DateTime, nullable=False)
+
+class AnalyticsSketchChange(Base):
+    """스케치에 아직 병합하지 않은 연결 응답의 uid/나이 변경 (user_responses 트리거가 쌓고 동기화가 꺼내 삭제)"""
+    __tablename__ = "analytics_sketch_changes"
+    
+    id = Column(BigInteger, primary_key=True)
+    uid = Column(String(255), nullable=False)
+    age = Column(Integer, nullable=True)
+    sign = Column(SmallInteger, nullable=False)      # 1: 추가된 응답/나이, -1: 재저장·삭제로 빠진 나이
+
+class AnalyticsTimeseries(Base):
+    """시간대별 이벤트 수 롤업 (question_sessions/user_responses 트리거와 병합 트랜잭션이 증가)"""
+    __tablename__ = "analytics_timeseries"
+    
+    metric = Column(String(50), primary_key=True)       # sessions_created, responses_saved, sessions_linked, merges
+    granularity = Column(String(10), primary_key=True)  # hour, day
+    bucket_start = Column(DateTime, primary_key=True)   # UTC 기준 구간 시작 (date_trunc)
+    shard = Column(SmallInteger, primary_key=True, default=0, server_default="0")  # 동시 쓰기를 나누는 행 번호 (트리거가 백엔드 PID로 선택, 조회 시 합산)
+    count = Column(BigInteger, nullable=False, default=0)
+
+# create_tables()로 만든 개발 DB에도 트리거 설치
+event.listen(Base.metadata, "after_create", DDL(ANALYTICS_ROLLUP_DDL).execute_if(dialect="postgresql"))
+event.listen(Base.metadata, "after_create", DDL(TIMESERIES_ROLLUP_DDL).execute_if(dialect="postgresql"))
+event.listen(Base.metadata, "after_create", DDL(SKETCH_CHANGES_DDL).execute_if(dialect="postgresql"))
+
 # Database table creation
 def create_tables():
     """Create tables"""
@@ -49,15 +49,6 @@ def initialize_firebase():
             pass
 
 
-def verify_firebase_token(token: str) -> dict:
-    """Verify Firebase ID token"""
-    try:
-        decoded_token = auth.verify_id_token(token)
-        return decoded_token
-    except Exception as e:
-        raise Exception(f"Invalid Firebase token: {str(e)}")
-
-
 def get_user_by_uid(uid: str) -> dict:
     """Get user information by UID"""
     try:
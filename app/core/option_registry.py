@@ -0,0 +1,93 @@
+from typing import Dict, Iterable, List, Optional
+
+
+class OptionSet:
+    """설문 옵션 하나의 라벨 <-> 정수 코드 매핑
+
+    코드는 저장된 데이터의 의미이므로 한 번 배정하면 바꾸거나 재사용하지 않습니다.
+    옵션을 추가할 때는 새 코드를 뒤에 붙이고, 없앨 옵션은 코드를 비워 둡니다.
+    """
+
+    def __init__(self, field: str, codes: Dict[int, str]):
+        self.field = field
+        self.label_by_code = dict(codes)
+        self.code_by_label = {label: code for code, label in codes.items()}
+        if len(self.code_by_label) != len(self.label_by_code):
+            raise ValueError(f"Duplicate option label in {field}")
+
+    @property
+    def labels(self) -> List[str]:
+        """코드 순서의 라벨 목록 (QuestionValidators *_OPTIONS)"""
+        return [self.label_by_code[code] for code in sorted(self.label_by_code)]
+
+    def __contains__(self, label: str) -> bool:
+        return label in self.code_by_label
+
+    def code(self, label: str) -> int:
+        try:
+            return self.code_by_label[label]
+        except KeyError:
+            raise ValueError(f"Unknown {self.field} option: {label}")
+
+    def label(self, code: int) -> str:
+        try:
+            return self.label_by_code[code]
+        except KeyError:
+            raise ValueError(f"Unknown {self.field} code: {code}")
+
+    def encode(self, labels: Optional[Iterable[str]]) -> Optional[List[int]]:
+        if labels is None:
+            return None
+        return [self.code(label) for label in labels]
+
+    def decode(self, codes: Optional[Iterable[int]]) -> Optional[List[str]]:
+        if codes is None:
+            return None
+        return [self.label(code) for code in codes]
+
+
+# 옵션 라벨은 QuestionScreen과 완전히 일치해야 함 (QuestionValidators가 이 목록을 그대로 사용)
+OPTION_REGISTRY: Dict[str, OptionSet] = {
+    option_set.field: option_set for option_set in (
+        OptionSet("period_description", {
+            1: "Regular", 2: "Irregular", 3: "Occasional Skips", 4: "I don't get periods", 5: "I'm not sure"
+        }),
+        OptionSet("cycle_length", {
+            1: "Less than 21 days", 2: "21-25 days", 3: "26-30 days", 4: "31-35 days", 5: "35+ days", 6: "I'm not sure"
+        }),
+        OptionSet("birth_control", {
+            1: "Hormonal Birth Control Pills", 2: "IUD (Intrauterine Device)"
+        }),
+        OptionSet("period_concerns", {
+            1: "Irregular Periods", 2: "Painful Periods", 3: "Light periods / Spotting", 4: "Heavy periods"
+        }),
+        OptionSet("body_concerns", {
+            1: "Bloating", 2: "Hot Flashes", 3: "Nausea",
+            4: "Difficulty losing weight / stubborn belly fat", 5: "Recent weight gain", 6: "Menstrual headaches"
+        }),
+        OptionSet("skin_hair_concerns", {
+            1: "Hirsutism (hair  growth on chin, nipples etc)", 2: "Thinning of hair", 3: "Adult Acne"
+        }),
+        OptionSet("mental_health_concerns", {
+            1: "Mood swings", 2: "Stress", 3: "Fatigue"
+        }),
+        OptionSet("top_concern", {
+            1: "Painful Periods", 2: "Bloating", 3: "Recent weight gain",
+            4: "Hirsutism (hair growth on chin, nipples etc)", 5: "Adult Acne", 6: "Mood swings"
+        }),
+        OptionSet("diagnosed_conditions", {
+            1: "PCOS", 2: "PCOD", 3: "Endometriosis", 4: "Dysmenorrhea (painful periods)",
+            5: "Amenorrhea (absence of periods)", 6: "Menorrhagia (prolonged/heavy bleeding)",
+            7: "Metrorrhagia (irregular bleeding)", 8: "Cushing's Syndrome (PMS)",
+            9: "Premenstrual Syndrome (PMS)", 10: "None of the above", 11: "Others (please specify)"
+        }),
+        OptionSet("other_concerns", {
+            1: "None of these", 2: "Others (please specify)"
+        })
+    )
+}
+
+# smallint[] 코드 배열로 저장하는 다중 선택 필드 (자유 입력 'Others:' 를 허용하는 필드는 제외)
+CODED_ARRAY_FIELDS = (
+    "birth_control", "period_concerns", "body_concerns", "skin_hair_concerns", "mental_health_concerns"
+)
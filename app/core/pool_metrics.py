@@ -0,0 +1,90 @@
+import bisect
+import threading
+import time
+from typing import Any, Dict, Type
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# 커넥션 체크아웃 대기 시간 히스토그램 버킷 상한 (ms)
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolStats:
+    """커넥션 풀 체크아웃 대기 시간/타임아웃 통계"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        # 마지막 칸은 가장 큰 버킷보다 오래 기다린 경우
+        self.wait_histogram = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            self.wait_histogram[bisect.bisect_left(WAIT_BUCKETS_MS, seconds * 1000)] += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lower_bounds = (0,) + WAIT_BUCKETS_MS[:-1]
+            labels = [f"{low}-{high}ms" for low, high in zip(lower_bounds, WAIT_BUCKETS_MS)] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.wait_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+                "wait_histogram": dict(zip(labels, self.wait_histogram))
+            }
+
+
+def instrumented_pool_class(base: Type[QueuePool], name: str) -> Type[QueuePool]:
+    """체크아웃 대기 시간을 기록하는 QueuePool 하위 클래스 생성
+
+    통계는 클래스 속성에 두어 dispose()/recreate()로 풀이 다시 만들어져도 유지됩니다.
+    """
+
+    class InstrumentedPool(base):
+        stats = PoolStats(name)
+
+        def _do_get(self):
+            start_time = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except PoolTimeoutError:
+                self.stats.record_timeout()
+                raise
+            self.stats.record_wait(time.perf_counter() - start_time)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+def pool_status(engine) -> Dict[str, Any]:
+    """엔진 풀의 현재 상태와 누적 대기 통계"""
+    pool = engine.pool
+    status = {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "timeout": pool.timeout()
+    }
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
@@ -0,0 +1,69 @@
+import threading
+import time
+from typing import Dict, Optional
+
+# 성공한 쓰기 응답에 마지막 쓰기 시각(유닉스 초)을 실어 보내는 쿠키/헤더 이름
+# 쿠키를 쓰지 않는 클라이언트는 받은 X-Last-Write 값을 다음 요청 헤더로 돌려보냄
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+
+WRITE_METHODS = frozenset(("POST", "PUT", "PATCH", "DELETE"))
+
+
+def write_marker() -> str:
+    """지금 시각을 마지막 쓰기 시각 값으로 (워커/서버와 무관하게 비교할 수 있도록 벽시계 기준)"""
+    return f"{time.time():.3f}"
+
+
+def wrote_recently(marker: Optional[str], window: float) -> bool:
+    """클라이언트가 돌려보낸 마지막 쓰기 시각이 window초 이내인지 확인 (값이 없거나 잘못되면 False)
+
+    값을 위조해도 그 클라이언트의 읽기가 primary로 갈 뿐이므로 서명하지 않습니다.
+    """
+    if not marker or window <= 0:
+        return False
+    try:
+        written_at = float(marker)
+    except ValueError:
+        return False
+    return 0 <= time.time() - written_at < window
+
+
+class RecentWrites:
+    """최근 쓰기 기록 (read-your-writes 보장용)
+
+    세션/사용자별로 마지막 쓰기 후 window초 동안은 읽기를 primary로 보내
+    복제 지연 때문에 방금 저장한 데이터가 보이지 않는 문제를 막습니다.
+    기록은 워커 프로세스별로 유지되므로, 다른 워커로 간 읽기는 클라이언트가 돌려보내는
+    마지막 쓰기 시각(LAST_WRITE_COOKIE / LAST_WRITE_HEADER)으로 판단합니다.
+    """
+
+    def __init__(self, window: float = 5.0, max_size: int = 100000):
+        self.window = window
+        self.max_size = max_size
+        self._expires_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _keys(session_id: Optional[str] = None, uid: Optional[str] = None):
+        if session_id:
+            yield f"session:{session_id}"
+        if uid:
+            yield f"uid:{uid}"
+
+    def mark(self, session_id: Optional[str] = None, uid: Optional[str] = None) -> None:
+        """쓰기 직후 호출 (커밋 이후)"""
+        if self.window <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._expires_at) >= self.max_size:
+                self._expires_at = {key: expires_at for key, expires_at in self._expires_at.items() if expires_at > now}
+            for key in self._keys(session_id, uid):
+                self._expires_at[key] = now + self.window
+
+    def is_recent(self, session_id: Optional[str] = None, uid: Optional[str] = None) -> bool:
+        """window초 이내에 해당 세션/사용자에 쓰기가 있었는지 확인"""
+        now = time.monotonic()
+        with self._lock:
+            return any(self._expires_at.get(key, 0) > now for key in self._keys(session_id, uid))
@@ -3,6 +3,7 @@ from firebase_admin import auth, credentials
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.config import settings
+from app.core.token_verifier import token_verifier
 import json
 import os
 
@@ -49,9 +50,9 @@ def initialize_firebase():
 
 
 async def verify_firebase_token(token: str) -> dict:
-    """Firebase ID 토큰 검증"""
+    """Firebase ID 토큰 검증 (auth 엔드포인트와 캐시 공유)"""
     try:
-        decoded_token = auth.verify_id_token(token)
+        decoded_token = await token_verifier.verify(token)
         return decoded_token
     except Exception as e:
         raise HTTPException(
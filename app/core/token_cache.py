@@ -0,0 +1,93 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+
+class TokenCache:
+    """검증된 Firebase ID 토큰 캐시 (LRU + TTL)
+
+    토큰 원문 대신 SHA-256 해시를 키로 사용하고, 각 항목은 토큰의 exp 클레임 시점에 만료됩니다.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.verify_count = 0
+        self.verify_seconds = 0.0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """캐시된 디코딩 결과 조회 (만료되었거나 없으면 None)"""
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, decoded_token = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return decoded_token
+
+    def set(self, token: str, decoded_token: Dict[str, Any]) -> None:
+        """검증된 토큰 저장 (exp 클레임이 없거나 이미 지났으면 저장하지 않음)"""
+        expires_at = decoded_token.get("exp")
+        if not expires_at or expires_at <= time.time():
+            return
+
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, decoded_token)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record_verify_time(self, seconds: float) -> None:
+        """캐시 미스 시 실제 서명 검증에 걸린 시간 기록"""
+        with self._lock:
+            self.verify_count += 1
+            self.verify_seconds += seconds
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """히트/미스 통계"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            avg_verify_ms = (self.verify_seconds / self.verify_count * 1000) if self.verify_count else 0.0
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "avg_verify_ms": round(avg_verify_ms, 3),
+                # 히트 1회당 서명 검증 1회를 절약한 것으로 추정
+                "estimated_saved_ms": round(avg_verify_ms * self.hits, 1)
+            }
+
+
+# auth.py / security.py 의존성이 함께 사용하는 공유 캐시
+token_cache = TokenCache(max_size=settings.TOKEN_CACHE_MAX_SIZE)
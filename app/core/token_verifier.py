@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import firebase_admin
+import httpx
+import jwt
+from cryptography.x509 import load_pem_x509_certificate
+
+from app.core.config import settings
+from app.core.token_cache import token_cache
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+class FirebaseTokenVerifier:
+    """이벤트 루프를 막지 않는 Firebase ID 토큰 검증기
+
+    Google 서명 인증서(x509)를 메모리에 보관하고 Cache-Control 만료 전에 백그라운드에서 갱신하며,
+    RS256 서명 검증은 크기가 제한된 스레드 풀에서 실행합니다.
+    """
+
+    def __init__(
+        self,
+        certs_url: str,
+        project_id: Optional[str] = None,
+        max_workers: int = 4,
+        refresh_margin: int = 300,
+        default_max_age: int = 3600,
+        clock_skew: int = 0
+    ):
+        self.certs_url = certs_url
+        self.project_id = project_id
+        self.refresh_margin = refresh_margin
+        self.default_max_age = default_max_age
+        self.clock_skew = clock_skew
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="token-verify")
+        self._keys: Dict[str, Any] = {}
+        self._keys_expire_at = 0.0
+        self._last_refresh_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """공개 키를 미리 받아 두고 백그라운드 갱신 작업 시작"""
+        if not self.project_id:
+            self.project_id = self._resolve_project_id()
+        try:
+            await self.refresh_keys()
+        except Exception as e:
+            logger.warning(f"Initial public key fetch failed: {e}")
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        """백그라운드 갱신 작업 종료"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    @staticmethod
+    def _resolve_project_id() -> str:
+        try:
+            project_id = firebase_admin.get_app().project_id
+            if project_id:
+                return project_id
+        except Exception:
+            pass
+        return settings.FIREBASE_PROJECT_ID
+
+    async def refresh_keys(self):
+        """인증서 엔드포인트에서 공개 키 세트를 받아 교체"""
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.get(self.certs_url)
+            response.raise_for_status()
+
+        keys = {
+            kid: load_pem_x509_certificate(cert.encode("utf-8")).public_key()
+            for kid, cert in response.json().items()
+        }
+        if not keys:
+            raise Exception("Public key set is empty")
+
+        match = _MAX_AGE_PATTERN.search(response.headers.get("cache-control", ""))
+        max_age = int(match.group(1)) if match else self.default_max_age
+
+        now = time.time()
+        self._keys = keys
+        self._keys_expire_at = now + max_age
+        self._last_refresh_at = now
+        logger.info(f"Firebase public keys refreshed: {len(keys)} keys, max-age {max_age}s")
+
+    async def _refresh_loop(self):
+        """Cache-Control 만료 refresh_margin초 전에 키 세트 갱신"""
+        while True:
+            delay = max(self._keys_expire_at - time.time() - self.refresh_margin, 30)
+            await asyncio.sleep(delay)
+            try:
+                await self.refresh_keys()
+            except Exception as e:
+                logger.warning(f"Background public key refresh failed: {e}")
+
+    async def _get_key(self, kid: Optional[str]):
+        """kid에 해당하는 공개 키 조회 (없거나 만료된 경우에만 요청 경로에서 갱신)"""
+        key = self._keys.get(kid)
+        if key is not None and self._keys_expire_at > time.time():
+            return key
+
+        async with self._refresh_lock:
+            key = self._keys.get(kid)
+            expired = self._keys_expire_at <= time.time()
+            # 알 수 없는 kid로 인한 과도한 갱신 방지 (최소 30초 간격)
+            if expired or (key is None and time.time() - self._last_refresh_at > 30):
+                await self.refresh_keys()
+                key = self._keys.get(kid)
+
+        if key is None:
+            raise Exception(f"No public key found for kid: {kid}")
+        return key
+
+    def _decode(self, token: str, key) -> Dict[str, Any]:
+        """RS256 서명 및 Firebase 클레임 검증 (스레드 풀에서 실행)"""
+        decoded_token = jwt.decode(
+            token,
+            key,
+            algorithms=["RS256"],
+            audience=self.project_id,
+            issuer=f"https://securetoken.google.com/{self.project_id}",
+            leeway=self.clock_skew,
+            options={"require": ["exp", "iat", "sub"]}
+        )
+
+        subject = decoded_token.get("sub")
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise Exception("Token has an invalid subject (sub) claim")
+        if decoded_token.get("auth_time", 0) > time.time() + self.clock_skew:
+            raise Exception("Token has an auth_time claim in the future")
+
+        decoded_token["uid"] = subject
+        return decoded_token
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """Firebase ID 토큰 검증 (검증된 토큰은 exp까지 캐시)"""
+        decoded_token = token_cache.get(token)
+        if decoded_token is not None:
+            return decoded_token
+
+        if not self.project_id:
+            self.project_id = self._resolve_project_id()
+
+        try:
+            header = jwt.get_unverified_header(token)
+            key = await self._get_key(header.get("kid"))
+
+            start_time = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            decoded_token = await loop.run_in_executor(self._executor, self._decode, token, key)
+            token_cache.record_verify_time(time.perf_counter() - start_time)
+        except Exception as e:
+            raise Exception(f"Invalid Firebase token: {str(e)}")
+
+        token_cache.set(token, decoded_token)
+        return decoded_token
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "project_id": self.project_id,
+            "keys": len(self._keys),
+            "keys_expire_in": max(int(self._keys_expire_at - time.time()), 0),
+            "background_refresh": self._refresh_task is not None and not self._refresh_task.done()
+        }
+
+
+token_verifier = FirebaseTokenVerifier(
+    certs_url=settings.FIREBASE_CERTS_URL,
+    project_id=settings.FIREBASE_PROJECT_ID if settings.FIREBASE_PROJECT_ID != "your-firebase-project-id" else None,
+    max_workers=settings.TOKEN_VERIFY_WORKERS,
+    refresh_margin=settings.TOKEN_KEYS_REFRESH_MARGIN
+)
@@ -1,15 +1,23 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
+import math
 import time
 import logging
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.api.v1.endpoints.auth import get_current_admin_user
 from app.core.logging import setup_logging
 from app.core.firebase import initialize_firebase
+from app.core.token_verifier import token_verifier
+from app.core.read_routing import LAST_WRITE_COOKIE, LAST_WRITE_HEADER, WRITE_METHODS, write_marker
+from app.services.cohort_index import cohort_index
+from app.services.analytics_sketches import analytics_sketch_sync
+from app.services.response_write_buffer import response_write_buffer
+from app.services.session_purge import session_purger
 
 # 로깅 설정
 setup_logging()
@@ -36,8 +44,31 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Firebase initialization failed: {e}")
     
+    # Token verifier public key preload and background refresh
+    await token_verifier.start()
+    
+    # Cohort bitmap index build and background sync
+    if settings.COHORT_INDEX_ENABLED:
+        await cohort_index.start()
+    
+    # Approximate analytics sketch sync (one worker at a time via row lock)
+    if settings.ANALYTICS_SKETCHES_ENABLED:
+        await analytics_sketch_sync.start()
+    
+    # Write buffer: coalesces per-question PATCHes, and group-commits full saves when enabled (flushed on shutdown)
+    await response_write_buffer.start()
+    
+    # Abandoned anonymous session purge (workers split batches via SKIP LOCKED)
+    if settings.SESSION_PURGE_ENABLED:
+        await session_purger.start()
+    
     yield
     # Application shutdown
+    await session_purger.stop()
+    await response_write_buffer.stop()
+    await analytics_sketch_sync.stop()
+    await cohort_index.stop()
+    await token_verifier.stop()
     logger.info("Application shutdown.")
 
 
@@ -93,6 +124,22 @@ def create_application() -> FastAPI:
         
         return response
 
+    # Read-your-writes marker: after a successful write, any worker routes this client's reads to the primary
+    @app.middleware("http")
+    async def mark_writes(request: Request, call_next):
+        response = await call_next(request)
+        if request.method in WRITE_METHODS and response.status_code < 400 and settings.READ_YOUR_WRITES_SECONDS > 0:
+            marker = write_marker()
+            response.headers[LAST_WRITE_HEADER] = marker
+            response.set_cookie(
+                LAST_WRITE_COOKIE, marker,
+                max_age=math.ceil(settings.READ_YOUR_WRITES_SECONDS),
+                httponly=True,
+                samesite="lax",
+                secure=settings.ENVIRONMENT == "production"
+            )
+        return response
+
     # Global exception handler
     @app.exception_handler(Exception)
     async def global_exception_handler(request: Request, exc: Exception):
@@ -114,6 +161,12 @@ def create_application() -> FastAPI:
             "version": settings.VERSION
         }
 
+    # 커넥션 풀 상태 (체크아웃 수, overflow, 대기 시간 히스토그램, 타임아웃)
+    @app.get("/health/db-pool")
+    async def db_pool_stats(current_user: dict = Depends(get_current_admin_user)):
+        from app.core.database import get_pool_stats
+        return get_pool_stats()
+
     return app
 
 
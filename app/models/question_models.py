@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, validator
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from app.core.config import settings
 from app.core.validators import QuestionValidators
 
 class SessionCreate(BaseModel):
@@ -102,6 +103,63 @@ class UserResponseData(BaseModel):
 class UserResponseCreate(BaseModel):
     session_id: str = Field(..., description="세션 ID")
     responses: UserResponseData
+    
+    @validator('session_id')
+    def validate_session_id(cls, v):
+        return QuestionValidators.validate_session_id(v)
+
+class ResponseFieldPatch(BaseModel):
+    # 필드 하나의 새 값 (null이면 해당 답변 지우기)
+    value: Any = Field(..., description="질문 하나의 새 값")
+
+class ResponseFieldUpdate(BaseModel):
+    session_id: str
+    response_id: int
+    field: str
+    value: Any
+    updated_at: datetime
+
+class BulkQuestionnaireItem(BaseModel):
+    """오프라인에서 모은 설문 하나 (세션 생성 + 응답 저장)"""
+    session_id: Optional[str] = Field(
+        None, pattern=QuestionValidators.SESSION_ID_PATTERN,
+        description="클라이언트가 만든 세션 ID (재전송해도 한 번만 저장, 없으면 서버가 생성)"
+    )
+    device_id: str = Field(..., description="디바이스 식별자")
+    responses: UserResponseData
+    collected_at: Optional[datetime] = Field(None, description="설문을 작성한 시각 (기본값: 수신 시각)")
+    
+    @validator('collected_at')
+    def validate_collected_at(cls, v):
+        if v is None:
+            return v
+        # 세션/응답 created_at과 같이 UTC naive로 저장
+        if v.tzinfo is not None:
+            v = v.astimezone(timezone.utc).replace(tzinfo=None)
+        now = datetime.utcnow()
+        if v > now + timedelta(minutes=5):
+            raise ValueError("collected_at is in the future")
+        # 오래된 시계열 구간을 임의로 부풀리지 못하도록 과거 범위 제한
+        if v < now - timedelta(days=settings.BULK_INGEST_MAX_BACKDATE_DAYS):
+            raise ValueError(f"collected_at is more than {settings.BULK_INGEST_MAX_BACKDATE_DAYS} days in the past")
+        return v
+
+class BulkIngestRequest(BaseModel):
+    # 잘못된 항목만 거절하도록 항목은 원본 그대로 받아 BulkQuestionnaireItem으로 하나씩 검증
+    items: List[Dict[str, Any]] = Field(..., min_length=1, description="BulkQuestionnaireItem 목록")
+
+class BulkIngestItemResult(BaseModel):
+    index: int
+    status: str  # created, already_created, conflict, invalid
+    session_id: Optional[str] = None
+    response_id: Optional[int] = None
+    errors: Optional[List[str]] = None
+
+class BulkIngestResponse(BaseModel):
+    created: int
+    already_created: int
+    rejected: int
+    results: List[BulkIngestItemResult]
 
 class SessionLinkRequest(BaseModel):
     uid: str = Field(..., description="Firebase UID")
@@ -129,9 +187,55 @@ class UserResponseFull(BaseModel):
     class Config:
         from_attributes = True
 
+class UserResponsePage(BaseModel):
+    items: List[UserResponseFull]
+    next_cursor: Optional[str] = Field(None, description="다음 페이지 커서 (마지막 페이지면 null)")
+    has_more: bool
+
 class AnalyticsResponse(BaseModel):
     total_users: int
     age_distribution: Dict[str, int]
     period_concerns_stats: Dict[str, int]
     body_concerns_stats: Dict[str, int]
-    top_concerns_stats: Dict[str, int] 
\ No newline at end of file
+    top_concerns_stats: Dict[str, int] 
+    # ?approximate=true 일 때만 채워짐 (스케치 기반 근사값)
+    approximate: bool = False
+    total_users_error: Optional[float] = Field(None, description="total_users 상대 표준 오차")
+    age_percentiles: Optional[Dict[str, float]] = None
+    sketch_synced_through: Optional[datetime] = None
+
+class TimeSeriesResponse(BaseModel):
+    """지표별 구간 합계 (series[metric][i]는 buckets[i]에 시작하는 구간, UTC)"""
+    bucket: str
+    start: datetime
+    end: datetime
+    buckets: List[datetime]
+    series: Dict[str, List[int]]
+
+class ConcernOption(BaseModel):
+    field: str
+    value: str
+    count: int
+
+class ConcernMatrixResponse(BaseModel):
+    """옵션 쌍별 동시 발생 행렬 (counts/lift의 i행 j열은 options[i]와 options[j])"""
+    total_responses: int
+    options: List[ConcernOption]
+    counts: List[List[int]]
+    lift: List[List[Optional[float]]]
+    elapsed_ms: float
+
+class CohortExpression(BaseModel):
+    """코호트 조건식: {"field", "value"} 또는 {"and": [...]}, {"or": [...]}, {"not": {...}} 중 하나"""
+    field: Optional[str] = Field(None, description="옵션 필드 (예: diagnosed_conditions)")
+    value: Optional[str] = Field(None, description="옵션 값 (예: PCOS)")
+    and_: Optional[List["CohortExpression"]] = Field(None, alias="and")
+    or_: Optional[List["CohortExpression"]] = Field(None, alias="or")
+    not_: Optional["CohortExpression"] = Field(None, alias="not")
+
+CohortExpression.model_rebuild()
+
+class CohortCountResponse(BaseModel):
+    count: int
+    total_users: int
+    elapsed_ms: float
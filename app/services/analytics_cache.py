@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import AsyncReadSessionLocal
+from app.services.question_service import AsyncQuestionService
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsCache:
+    """분석 데이터 캐시 (TTL + stale-while-revalidate + single-flight)
+
+    - ttl초 이내: 캐시된 값을 그대로 반환 (HIT)
+    - ttl ~ ttl + stale_ttl초: 캐시된 값을 반환하고 백그라운드에서 갱신 (STALE)
+    - 그 이후 또는 값이 없을 때: 갱신이 끝날 때까지 대기 (MISS)
+
+    워커(이벤트 루프)당 동시에 하나의 재계산만 실행하고, 나머지 요청은 같은 결과를 기다립니다.
+    """
+
+    def __init__(self, ttl: int = 30, stale_ttl: int = 300):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._value: Optional[Dict[str, Any]] = None
+        self._computed_at = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.refresh_seconds = 0.0
+
+    async def _load(self, loader: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        start_time = time.perf_counter()
+        try:
+            value = await loader()
+        except Exception:
+            self.refresh_failures += 1
+            raise
+        finally:
+            self._inflight = None
+
+        self._value = value
+        self._computed_at = time.monotonic()
+        self.refreshes += 1
+        self.refresh_seconds += time.perf_counter() - start_time
+        return value
+
+    def _refresh(self, loader: Callable[[], Awaitable[Dict[str, Any]]]) -> asyncio.Task:
+        """진행 중인 재계산이 있으면 그 작업을, 없으면 새 작업을 반환 (single-flight)"""
+        if self._inflight is None:
+            self._inflight = asyncio.create_task(self._load(loader))
+            self._inflight.add_done_callback(self._log_failure)
+        return self._inflight
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Analytics cache refresh failed: {task.exception()}")
+
+    async def get(self, loader: Callable[[], Awaitable[Dict[str, Any]]]) -> Tuple[Dict[str, Any], float, str]:
+        """분석 데이터 조회 -> (값, 캐시 나이(초), HIT/STALE/MISS)"""
+        age = time.monotonic() - self._computed_at
+
+        if self._value is not None and age < self.ttl:
+            self.hits += 1
+            return self._value, age, "HIT"
+
+        if self._value is not None and age < self.ttl + self.stale_ttl:
+            self.stale_hits += 1
+            self._refresh(loader)
+            return self._value, age, "STALE"
+
+        self.misses += 1
+        # 요청이 취소되어도 다른 대기자를 위해 재계산은 계속 진행
+        value = await asyncio.shield(self._refresh(loader))
+        return value, 0.0, "MISS"
+
+    def invalidate(self) -> None:
+        """다음 요청에서 재계산하도록 캐시 비우기"""
+        self._value = None
+        self._computed_at = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "age": round(time.monotonic() - self._computed_at, 3) if self._value is not None else None,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "refreshing": self._inflight is not None,
+            "avg_refresh_ms": round(self.refresh_seconds / self.refreshes * 1000, 3) if self.refreshes else 0.0
+        }
+
+
+async def load_analytics() -> Dict[str, Any]:
+    """요청 세션과 분리된 별도 세션으로 분석 데이터 계산 (백그라운드 갱신에서도 사용)
+
+    집계는 약간의 복제 지연을 허용하므로 읽기 복제본에서 실행합니다.
+    """
+    async with AsyncReadSessionLocal() as db:
+        return await AsyncQuestionService(db).get_analytics()
+
+
+async def load_approximate_analytics() -> Dict[str, Any]:
+    """스케치 기반 근사 분석 데이터 (저장된 스케치 행만 읽으므로 캐시하지 않음)"""
+    async with AsyncReadSessionLocal() as db:
+        return await AsyncQuestionService(db).get_analytics(approximate=True)
+
+
+# /questions/analytics 엔드포인트가 사용하는 워커별 캐시
+analytics_cache = AnalyticsCache(
+    ttl=settings.ANALYTICS_CACHE_TTL,
+    stale_ttl=settings.ANALYTICS_CACHE_STALE_TTL
+)
@@ -0,0 +1,161 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, delete, distinct, text, SmallInteger
+from sqlalchemy.dialects.postgresql import insert
+from app.core.database import UserResponse, AnalyticsCounter, AnalyticsUserRefcount
+from app.core.option_registry import OPTION_REGISTRY
+from collections import Counter
+from typing import List, Dict, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 롤업으로 관리하는 건강 문제 필드 (smallint[] 옵션 코드 배열, 버킷은 코드 문자열)
+CONCERN_FIELDS = ("period_concerns", "body_concerns", "skin_hair_concerns", "mental_health_concerns")
+
+TOTAL_USERS = "total_users"
+
+
+def concern_codes(column):
+    """smallint[] 옵션 코드 배열을 행으로 펼치는 표현식"""
+    return func.unnest(column, type_=SmallInteger)
+
+
+def decode_concern_stats(field: str, counts: Dict[str, int]) -> Dict[str, int]:
+    """코드(문자열) 기준 집계를 옵션 라벨 기준으로 변환"""
+    option_set = OPTION_REGISTRY[field]
+    return {option_set.label(int(code)): count for code, count in counts.items()}
+
+
+class AnalyticsRollup:
+    """analytics_counters 롤업 조회/검증/재계산
+
+    증감은 user_responses의 문장 단위 트리거(ANALYTICS_ROLLUP_DDL)가 응답 저장, 세션 연결,
+    병합과 같은 트랜잭션 안에서 처리하므로 여기서는 읽기와 전체 재계산만 담당합니다.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def read(self) -> Dict[str, Any]:
+        """롤업에서 분석 데이터 조회 (테이블 크기와 무관한 상수 시간 읽기)"""
+        rows = self.db.execute(
+            select(AnalyticsCounter.metric, AnalyticsCounter.bucket, AnalyticsCounter.count)
+            .where(AnalyticsCounter.count > 0)
+        ).all()
+
+        stats: Dict[str, Dict[str, int]] = {}
+        for metric, bucket, count in rows:
+            stats.setdefault(metric, {})[bucket] = count
+
+        return {
+            "total_users": stats.get(TOTAL_USERS, {}).get("", 0),
+            "age_distribution": {f"{bucket}대": count for bucket, count in stats.get("age_group", {}).items()},
+            "period_concerns_stats": decode_concern_stats("period_concerns", stats.get("period_concerns", {})),
+            "body_concerns_stats": decode_concern_stats("body_concerns", stats.get("body_concerns", {})),
+            "top_concerns_stats": stats.get("top_concern", {})
+        }
+
+    def live_counters(self) -> Counter:
+        """원본 테이블에서 롤업 값을 처음부터 다시 계산"""
+        counts = Counter()
+        linked = UserResponse.uid.isnot(None)
+
+        total_users = self.db.execute(select(func.count(distinct(UserResponse.uid))).where(linked)).scalar()
+        if total_users:
+            counts[(TOTAL_USERS, "")] = total_users
+
+        age_group = ((UserResponse.age // 10) * 10).label("age_group")
+        for bucket, count in self.db.execute(
+            select(age_group, func.count()).where(UserResponse.age > 0, linked).group_by(age_group)
+        ):
+            counts[("age_group", str(bucket))] = count
+
+        # 트리거와 같이 옵션 코드를 문자열 버킷으로 사용
+        for field in CONCERN_FIELDS:
+            column = getattr(UserResponse, field)
+            concerns = select(concern_codes(column).label("concern")).where(column.isnot(None), linked).subquery()
+            for code, count in self.db.execute(
+                select(concerns.c.concern, func.count()).group_by(concerns.c.concern)
+            ):
+                counts[(field, str(code))] = count
+
+        for bucket, count in self.db.execute(
+            select(UserResponse.top_concern, func.count())
+            .where(UserResponse.top_concern.isnot(None), UserResponse.top_concern != "", linked)
+            .group_by(UserResponse.top_concern)
+        ):
+            counts[("top_concern", bucket)] = count
+
+        return counts
+
+    def stored_counters(self) -> Counter:
+        rows = self.db.execute(
+            select(AnalyticsCounter.metric, AnalyticsCounter.bucket, AnalyticsCounter.count)
+            .where(AnalyticsCounter.count != 0)
+        ).all()
+        return Counter({(metric, bucket): count for metric, bucket, count in rows})
+
+    def verify(self) -> List[Dict[str, Any]]:
+        """롤업과 원본 데이터 비교 (불일치 항목 목록 반환)"""
+        live = self.live_counters()
+        stored = self.stored_counters()
+        mismatches = [
+            {"metric": metric, "bucket": bucket, "stored": stored.get((metric, bucket), 0), "live": live.get((metric, bucket), 0)}
+            for metric, bucket in sorted(set(live) | set(stored))
+            if stored.get((metric, bucket), 0) != live.get((metric, bucket), 0)
+        ]
+
+        # 사용자별 응답 수도 원본과 일치해야 이후 total_users 증감이 정확함
+        live_refcounts = (
+            select(UserResponse.uid, func.count().label("responses"))
+            .where(UserResponse.uid.isnot(None))
+            .group_by(UserResponse.uid)
+            .subquery()
+        )
+        refcount_mismatches = self.db.execute(
+            select(func.count()).select_from(
+                live_refcounts.join(
+                    AnalyticsUserRefcount, live_refcounts.c.uid == AnalyticsUserRefcount.uid, full=True
+                )
+            ).where(live_refcounts.c.responses.is_distinct_from(AnalyticsUserRefcount.responses))
+        ).scalar()
+        if refcount_mismatches:
+            mismatches.append({"metric": "user_refcounts", "bucket": "", "stored": None, "live": None, "mismatched_users": refcount_mismatches})
+
+        return mismatches
+
+    def rebuild(self) -> Dict[str, int]:
+        """롤업을 원본 데이터에서 다시 만들고 검증 (쓰기를 잠시 막은 상태로 실행)"""
+        try:
+            # 재계산 중 들어오는 증감이 유실되지 않도록 응답 쓰기 차단
+            self.db.execute(text("LOCK TABLE user_responses IN SHARE MODE"))
+            self.db.execute(text("LOCK TABLE analytics_counters, analytics_user_refcounts IN EXCLUSIVE MODE"))
+
+            self.db.execute(delete(AnalyticsCounter))
+            self.db.execute(delete(AnalyticsUserRefcount))
+
+            counts = self.live_counters()
+            if counts:
+                self.db.execute(
+                    insert(AnalyticsCounter),
+                    [{"metric": metric, "bucket": bucket, "count": count} for (metric, bucket), count in counts.items()]
+                )
+            self.db.execute(
+                insert(AnalyticsUserRefcount).from_select(
+                    ["uid", "responses"],
+                    select(UserResponse.uid, func.count()).where(UserResponse.uid.isnot(None)).group_by(UserResponse.uid)
+                )
+            )
+
+            mismatches = self.verify()
+            if mismatches:
+                raise Exception(f"Rollup verification failed: {mismatches[:10]}")
+
+            self.db.commit()
+            logger.info(f"Analytics rollups rebuilt: {len(counts)} counters")
+            return {"counters": len(counts), "total_users": counts.get((TOTAL_USERS, ""), 0)}
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Analytics rollup rebuild failed: {str(e)}")
+            raise Exception(f"분석 롤업 재계산 실패: {str(e)}")
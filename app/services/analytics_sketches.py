@@ -0,0 +1,300 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, AnalyticsSketch, AnalyticsSketchChange, UserResponse, run_with_session
+from app.core.sketches import HyperLogLog, TDigest
+
+logger = logging.getLogger(__name__)
+
+LINKED_UIDS = "linked_uids"
+AGES = "age"
+# 재저장/삭제로 빠진 나이 (읽을 때 AGES에서 뺌)
+REMOVED_AGES = "age_removed"
+SKETCH_NAMES = (LINKED_UIDS, AGES, REMOVED_AGES)
+
+# 스트리밍으로 한 번에 읽는 응답 행 수 / 한 트랜잭션에서 소비하는 변경 행 수
+SYNC_FETCH_SIZE = 5000
+
+# 재구성이 동시 동기화와 겹쳐 직렬화 실패하면 다시 시도하는 횟수
+REBUILD_ATTEMPTS = 3
+
+AGE_PERCENTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+
+def _age_cdf(added: TDigest, removed: TDigest, value: float) -> float:
+    """추가된 나이에서 빠진 나이를 뺀 분포의 value 이하 비율"""
+    total = added.count - removed.count
+    if total <= 0:
+        return 0.0
+    below = added.count * added.cdf(value) - removed.count * removed.cdf(value)
+    return min(max(below / total, 0.0), 1.0)
+
+
+def _age_quantile(added: TDigest, removed: TDigest, q: float) -> Optional[float]:
+    """빠진 나이를 반영한 q 분위수 (빠진 값이 없으면 t-digest 분위수 그대로)"""
+    if removed.count == 0:
+        return added.quantile(q)
+    if added.count - removed.count <= 0:
+        return None
+    # 차감한 cdf는 닫힌 형태의 역함수가 없으므로 [min, max]에서 이분 탐색
+    low, high = added.min, added.max
+    for _ in range(50):
+        middle = (low + high) / 2
+        if _age_cdf(added, removed, middle) < q:
+            low = middle
+        else:
+            high = middle
+    return high
+
+
+class AnalyticsSketches:
+    """analytics_sketches 조회/증분 동기화/재구성
+
+    - linked_uids: 연결된 사용자 uid의 HyperLogLog (total_users 근사)
+    - age / age_removed: 연결된 응답 나이의 t-digest와, 재저장/삭제로 빠진 나이의 t-digest
+      (읽을 때 앞의 분포에서 뒤의 분포를 빼서 나이 분포와 분위수 근사)
+
+    user_responses 트리거가 연결된 응답의 uid/나이 변경을 analytics_sketch_changes에 쌓고
+    (같은 트랜잭션이므로 커밋된 쓰기는 빠짐없이 쌓임), 어느 워커든 쌓인 행을 DELETE ... RETURNING으로
+    꺼내 저장된 스케치에 병합합니다. 시각 워터마크가 없으므로 늦게 커밋된 쓰기도 다음 동기화에서 반영됩니다.
+    HyperLogLog는 삭제를 표현할 수 없으므로 응답이 모두 지워진 사용자는 주기적 재구성(rebuild)으로 보정합니다.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _load(self, lock: bool = False) -> Dict[str, AnalyticsSketch]:
+        stmt = select(AnalyticsSketch).where(AnalyticsSketch.name.in_(SKETCH_NAMES))
+        if lock:
+            # 다른 워커가 동기화 중이면 기다리지 않고 건너뜀
+            stmt = stmt.with_for_update(skip_locked=True)
+        return {row.name: row for row in self.db.scalars(stmt)}
+
+    def _db_now(self):
+        # updated_at은 UTC(naive)로 저장되므로 DB 시각도 UTC로 비교
+        return self.db.execute(select(func.timezone("UTC", func.now()))).scalar()
+
+    def _empty(self) -> Tuple[HyperLogLog, TDigest, TDigest]:
+        return (
+            HyperLogLog(settings.ANALYTICS_SKETCH_HLL_PRECISION),
+            TDigest(settings.ANALYTICS_SKETCH_TDIGEST_COMPRESSION),
+            TDigest(settings.ANALYTICS_SKETCH_TDIGEST_COMPRESSION)
+        )
+
+    def _scan(self) -> Tuple[HyperLogLog, TDigest, int]:
+        """연결된 응답 전체로 스케치 생성"""
+        uids, ages, _ = self._empty()
+        stmt = select(UserResponse.uid, UserResponse.age).where(UserResponse.uid.isnot(None))
+
+        scanned = 0
+        for uid, age in self.db.execute(stmt.execution_options(yield_per=SYNC_FETCH_SIZE)):
+            uids.add(uid)
+            if age and age > 0:
+                ages.add(age)
+            scanned += 1
+        return uids, ages, scanned
+
+    def _save(self, uids: HyperLogLog, ages: TDigest, removed_ages: TDigest, synced_through, rebuilt_at) -> None:
+        stmt = insert(AnalyticsSketch).values([
+            {"name": name, "data": sketch.to_bytes(), "synced_through": synced_through, "rebuilt_at": rebuilt_at}
+            for name, sketch in ((LINKED_UIDS, uids), (AGES, ages), (REMOVED_AGES, removed_ages))
+        ])
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[AnalyticsSketch.name],
+            set_={
+                "data": stmt.excluded.data,
+                "synced_through": stmt.excluded.synced_through,
+                "rebuilt_at": stmt.excluded.rebuilt_at
+            }
+        ))
+
+    def _consume_changes(self, uids: HyperLogLog, ages: TDigest, removed_ages: TDigest) -> int:
+        """쌓인 변경 행을 최대 SYNC_FETCH_SIZE개 꺼내 스케치에 반영 (꺼낸 행 수, 커밋 전까지 삭제 미확정)"""
+        batch = (
+            select(AnalyticsSketchChange.id)
+            .order_by(AnalyticsSketchChange.id)
+            .limit(SYNC_FETCH_SIZE)
+            .scalar_subquery()
+        )
+        rows = self.db.execute(
+            delete(AnalyticsSketchChange)
+            .where(AnalyticsSketchChange.id.in_(batch))
+            .returning(AnalyticsSketchChange.uid, AnalyticsSketchChange.age, AnalyticsSketchChange.sign)
+        ).all()
+        for uid, age, sign in rows:
+            if sign > 0:
+                uids.add(uid)
+                if age and age > 0:
+                    ages.add(age)
+            elif age and age > 0:
+                removed_ages.add(age)
+        return len(rows)
+
+    def sync(self, rebuild_after: Optional[timedelta] = None) -> Optional[int]:
+        """쌓인 변경 행을 저장된 스케치에 병합 (반영한 행 수, 다른 워커가 진행 중이면 None)
+
+        SYNC_FETCH_SIZE개씩 트랜잭션마다 커밋하며 큐가 빌 때까지 반복합니다.
+        마지막 재구성 후 rebuild_after가 지났거나 스케치가 없으면 전체 재구성합니다.
+        """
+        merged = 0
+        while True:
+            try:
+                rows = self._load(lock=True)
+                if len(rows) != len(SKETCH_NAMES):
+                    self.db.rollback()
+                    # 행이 다 있는데 못 잡았으면 다른 워커가 진행 중, 일부라도 없으면 처음부터 구성
+                    if self.db.scalar(select(func.count()).select_from(AnalyticsSketch)) >= len(SKETCH_NAMES):
+                        return merged or None
+                    return self.rebuild()
+
+                now = self._db_now()
+                if rebuild_after is not None and now - rows[LINKED_UIDS].rebuilt_at > rebuild_after:
+                    self.db.rollback()
+                    return self.rebuild()
+
+                uids = HyperLogLog.from_bytes(rows[LINKED_UIDS].data)
+                ages = TDigest.from_bytes(rows[AGES].data)
+                removed_ages = TDigest.from_bytes(rows[REMOVED_AGES].data)
+                consumed = self._consume_changes(uids, ages, removed_ages)
+                if consumed:
+                    self._save(uids, ages, removed_ages, now, rows[LINKED_UIDS].rebuilt_at)
+                self.db.commit()
+
+            except Exception as e:
+                self.db.rollback()
+                logger.error(f"Analytics sketch sync failed: {str(e)}")
+                raise Exception(f"분석 스케치 동기화 실패: {str(e)}")
+
+            merged += consumed
+            if consumed < SYNC_FETCH_SIZE:
+                return merged
+
+    def rebuild(self) -> int:
+        """연결된 응답 전체로 스케치를 다시 만들기 (반영한 행 수)
+
+        REPEATABLE READ 한 스냅샷 안에서 쌓인 변경 행을 비우고 전체를 스캔하므로, 스냅샷 이전에 커밋된
+        변경은 스캔에만, 이후에 커밋된 변경은 큐에만 들어가 두 번 세거나 빠뜨리지 않습니다.
+        """
+        for attempt in range(REBUILD_ATTEMPTS):
+            try:
+                # 격리 수준은 트랜잭션 시작 전에만 바꿀 수 있음
+                self.db.rollback()
+                self.db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+                # 진행 중인 증분 동기화가 끝날 때까지 대기 후 교체
+                self.db.scalars(
+                    select(AnalyticsSketch).where(AnalyticsSketch.name.in_(SKETCH_NAMES)).with_for_update()
+                ).all()
+                now = self._db_now()
+                self.db.execute(delete(AnalyticsSketchChange))
+                uids, ages, scanned = self._scan()
+                _, _, removed_ages = self._empty()
+                self._save(uids, ages, removed_ages, now, now)
+                self.db.commit()
+                logger.info(f"Analytics sketches rebuilt from {scanned} responses")
+                return scanned
+
+            except OperationalError as e:
+                self.db.rollback()
+                # 스냅샷 이후 다른 워커가 스케치를 갱신했으면 (40001) 새 스냅샷으로 다시 시도
+                if getattr(e.orig, "pgcode", None) == "40001" and attempt + 1 < REBUILD_ATTEMPTS:
+                    continue
+                logger.error(f"Analytics sketch rebuild failed: {str(e)}")
+                raise Exception(f"분석 스케치 재구성 실패: {str(e)}")
+            except Exception as e:
+                self.db.rollback()
+                logger.error(f"Analytics sketch rebuild failed: {str(e)}")
+                raise Exception(f"분석 스케치 재구성 실패: {str(e)}")
+
+    def read(self) -> Dict[str, Any]:
+        """저장된 스케치에서 근사 total_users / 나이 분포 / 나이 분위수 계산 (행 3개 읽기)"""
+        rows = self._load()
+        uids, ages, removed_ages = self._empty()
+        if LINKED_UIDS in rows:
+            uids = HyperLogLog.from_bytes(rows[LINKED_UIDS].data)
+        if AGES in rows:
+            ages = TDigest.from_bytes(rows[AGES].data)
+        if REMOVED_AGES in rows:
+            removed_ages = TDigest.from_bytes(rows[REMOVED_AGES].data)
+
+        # 나이는 정수이므로 10세 구간 [d, d+10)의 수는 cdf(d+9.5) - cdf(d-0.5)
+        age_distribution = {}
+        total_ages = ages.count - removed_ages.count
+        if total_ages > 0:
+            for decade in range(int(ages.min) // 10 * 10, int(ages.max) + 1, 10):
+                count = round(total_ages * (
+                    _age_cdf(ages, removed_ages, decade + 9.5) - _age_cdf(ages, removed_ages, decade - 0.5)
+                ))
+                if count > 0:
+                    age_distribution[f"{decade}대"] = count
+
+        return {
+            "total_users": uids.estimate(),
+            "total_users_error": round(uids.relative_error, 4),
+            "age_distribution": age_distribution,
+            "age_percentiles": {
+                f"p{int(q * 100)}": round(_age_quantile(ages, removed_ages, q), 1) for q in AGE_PERCENTILES
+            } if total_ages > 0 else {},
+            "sketch_synced_through": rows[LINKED_UIDS].synced_through if LINKED_UIDS in rows else None
+        }
+
+
+class AnalyticsSketchSync:
+    """워커마다 주기적으로 쌓인 변경을 스케치에 병합 (행 잠금으로 한 번에 한 워커만 실행)"""
+
+    def __init__(self, sync_interval: int = 60, rebuild_interval: int = 86400):
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self._task: Optional[asyncio.Task] = None
+        self.syncs = 0
+        self.rows_merged = 0
+        self.sync_seconds = 0.0
+
+    async def run_once(self) -> Optional[int]:
+        start_time = time.perf_counter()
+        rebuild_after = timedelta(seconds=self.rebuild_interval)
+        # 스캔과 스케치 병합은 CPU를 쓰므로 이벤트 루프가 아닌 워커 스레드에서 실행
+        scanned = await asyncio.to_thread(
+            run_with_session, SessionLocal, lambda db: AnalyticsSketches(db).sync(rebuild_after)
+        )
+        if scanned is not None:
+            self.syncs += 1
+            self.rows_merged += scanned
+            self.sync_seconds += time.perf_counter() - start_time
+        return scanned
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sync_loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning(f"Analytics sketch sync failed: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+
+# lifespan에서 시작하는 워커별 동기화 작업
+analytics_sketch_sync = AnalyticsSketchSync(
+    sync_interval=settings.ANALYTICS_SKETCH_SYNC_INTERVAL,
+    rebuild_interval=settings.ANALYTICS_SKETCH_REBUILD_INTERVAL
+)
@@ -0,0 +1,121 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, cast, DateTime, ARRAY
+from app.core.database import AnalyticsTimeseries
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 트리거(sessions_created, sessions_linked, responses_saved)와 병합 트랜잭션(merges)이 집계하는 지표
+TIMESERIES_METRICS = ("sessions_created", "responses_saved", "sessions_linked", "merges")
+
+# 조회 구간 -> 읽어 올 저장 단위 (주/월은 일 단위 행을 합산)
+TIMESERIES_BUCKETS = {"hour": "hour", "day": "day", "week": "day", "month": "day"}
+
+# 한 번에 반환하는 최대 구간 수 (시간 단위 100일, 일 단위 약 6년)
+MAX_TIMESERIES_POINTS = 2400
+
+
+def record_timeseries_event(db: Session, metric: str, at: Optional[datetime] = None) -> None:
+    """트리거로 잡을 수 없는 이벤트(병합 등)를 현재 트랜잭션 안에서 구간 카운터에 더하기"""
+    stamps = cast([at or datetime.utcnow()], ARRAY(DateTime))
+    db.execute(select(func.analytics_timeseries_add(metric, stamps)))
+
+
+def to_utc(value: datetime) -> datetime:
+    """시간대가 있는 시각은 UTC naive로 변환 (없으면 UTC로 간주)"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def truncate_bucket(value: datetime, bucket: str) -> datetime:
+    """date_trunc(bucket, value)와 같은 구간 시작 (주는 월요일 시작)"""
+    if bucket == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == "day":
+        return day
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def next_bucket(value: datetime, bucket: str) -> datetime:
+    if bucket == "hour":
+        return value + timedelta(hours=1)
+    if bucket == "day":
+        return value + timedelta(days=1)
+    if bucket == "week":
+        return value + timedelta(weeks=1)
+    return value.replace(year=value.year + value.month // 12, month=value.month % 12 + 1)
+
+
+class AnalyticsTimeSeries:
+    """analytics_timeseries 구간 조회
+
+    원본 행 대신 시간/일 단위 롤업 행만 읽으므로 90일 일별 차트는 지표당 최대 90 x 샤드 수 행을 읽습니다.
+    한 구간은 샤드별 여러 행에 나뉘어 있으므로 항상 합산해서 읽습니다.
+    모든 구간은 UTC 기준입니다.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def bucket_starts(self, start: datetime, end: datetime, bucket: str) -> List[datetime]:
+        """[start, end) 구간을 덮는 bucket 시작 시각 목록 (빈 구간도 0으로 채우기 위함)"""
+        starts = []
+        current = truncate_bucket(start, bucket)
+        while current < end:
+            starts.append(current)
+            if len(starts) > MAX_TIMESERIES_POINTS:
+                raise ValueError(f"Range too large: more than {MAX_TIMESERIES_POINTS} {bucket} buckets")
+            current = next_bucket(current, bucket)
+        return starts
+
+    def query(self, start: datetime, end: datetime, bucket: str = "day", metrics: Optional[List[str]] = None) -> Dict[str, Any]:
+        """[start, end) 구간의 지표별 bucket 단위 합계 (형식이 잘못되면 ValueError)"""
+        if bucket not in TIMESERIES_BUCKETS:
+            raise ValueError(f"Unknown bucket: {bucket}")
+        metrics = list(dict.fromkeys(metrics or TIMESERIES_METRICS))
+        unknown = [metric for metric in metrics if metric not in TIMESERIES_METRICS]
+        if unknown:
+            raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+        if start >= end:
+            raise ValueError("start must be before end")
+
+        starts = self.bucket_starts(start, end, bucket)
+        granularity = TIMESERIES_BUCKETS[bucket]
+        bucket_start = AnalyticsTimeseries.bucket_start
+        if bucket != granularity:
+            bucket_start = func.date_trunc(bucket, AnalyticsTimeseries.bucket_start)
+        bucket_start = bucket_start.label("bucket_start")
+
+        try:
+            rows = self.db.execute(
+                select(AnalyticsTimeseries.metric, bucket_start, func.sum(AnalyticsTimeseries.count))
+                .where(
+                    AnalyticsTimeseries.metric.in_(metrics),
+                    AnalyticsTimeseries.granularity == granularity,
+                    AnalyticsTimeseries.bucket_start >= starts[0],
+                    AnalyticsTimeseries.bucket_start < end
+                )
+                .group_by(AnalyticsTimeseries.metric, bucket_start)
+            ).all()
+        except Exception as e:
+            logger.error(f"Timeseries retrieval failed: {str(e)}")
+            raise Exception(f"시계열 조회 실패: {str(e)}")
+
+        position = {bucket_time: index for index, bucket_time in enumerate(starts)}
+        series = {metric: [0] * len(starts) for metric in metrics}
+        for metric, bucket_time, count in rows:
+            series[metric][position[bucket_time]] = int(count)
+
+        return {
+            "bucket": bucket,
+            "start": starts[0],
+            "end": end,
+            "buckets": starts,
+            "series": series
+        }
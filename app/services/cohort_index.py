@@ -0,0 +1,294 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, ReadSessionLocal, UserResponse, run_with_session
+from app.core.option_registry import OPTION_REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# 인덱스 대상 필드 (옵션 레지스트리에 등록된 모든 설문 항목)
+INDEXED_FIELDS = tuple(OPTION_REGISTRY)
+
+# 비트맵 계산에 필요한 컬럼만 조회 (ORM 객체를 만들지 않음)
+INDEX_COLUMNS = (UserResponse.uid, *(getattr(UserResponse, field) for field in INDEXED_FIELDS))
+
+# 증분 동기화 시 커밋 지연을 감안해 워터마크보다 앞쪽까지 다시 읽는 구간
+SYNC_OVERLAP = timedelta(seconds=60)
+
+# 한 번에 다시 계산할 사용자 수
+REFRESH_BATCH_SIZE = 500
+
+
+class CohortIndex:
+    """옵션 값별 사용자 비트맵 인덱스 (워커 메모리)
+
+    연결된 사용자마다 비트 위치를 하나 배정하고, 옵션 값마다 그 값을 응답한 사용자의
+    비트를 켠 비트셋(파이썬 int)을 유지합니다. AND/OR/NOT 코호트 계산은 비트 연산과
+    popcount만으로 끝나므로 행 수와 무관하게 밀리초 단위로 응답합니다.
+
+    - 이 워커의 쓰기는 AsyncQuestionService가 mark_dirty로 알려 다음 조회 전에 반영
+    - 다른 워커의 쓰기는 updated_at 워터마크 기반 증분 동기화로 반영
+    - 감지할 수 없는 변경(다른 사용자로 재연결된 세션의 이전 소유자 등)은 주기적 전체 재구성으로 보정
+
+    사용자별 토큰 집합은 같은 조합끼리 공유(intern)하므로 메모리는 사용자당 포인터 하나 수준입니다.
+    DB 읽기와 비트맵 계산은 워커 스레드에서 하고, 결과 교체만 이벤트 루프에서 합니다.
+    """
+
+    def __init__(self, sync_interval: int = 30, rebuild_interval: int = 3600):
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self._ordinals: Dict[str, int] = {}
+        self._user_tokens: List[frozenset] = []
+        self._token_sets: Dict[frozenset, frozenset] = {}
+        self._bitmaps: Dict[tuple, int] = {}
+        self._universe = 0
+        self._watermark: Optional[datetime] = None
+        self._dirty: Set[str] = set()
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.build_seconds = 0.0
+
+    @staticmethod
+    def _row_tokens(row) -> Set[tuple]:
+        """응답 행 하나에서 (필드, 라벨) 토큰 추출"""
+        tokens = set()
+        for field in INDEXED_FIELDS:
+            value = getattr(row, field)
+            if value is None:
+                continue
+            labels = value if isinstance(value, list) else [value]
+            option_set = OPTION_REGISTRY[field]
+            tokens.update((field, label) for label in labels if label in option_set)
+        return tokens
+
+    @staticmethod
+    def _intern(token_sets: Dict[frozenset, frozenset], tokens: Iterable[tuple]) -> frozenset:
+        tokens = frozenset(tokens)
+        return token_sets.setdefault(tokens, tokens)
+
+    def _ordinal(self, uid: str) -> int:
+        ordinal = self._ordinals.get(uid)
+        if ordinal is None:
+            ordinal = len(self._ordinals)
+            self._ordinals[uid] = ordinal
+            self._user_tokens.append(frozenset())
+        return ordinal
+
+    def _set_user(self, ordinal: int, tokens: frozenset) -> None:
+        """사용자 한 명의 토큰 집합을 교체하고 바뀐 비트만 갱신"""
+        previous = self._user_tokens[ordinal]
+        bit = 1 << ordinal
+        for token in previous - tokens:
+            self._bitmaps[token] &= ~bit
+        for token in tokens - previous:
+            self._bitmaps[token] = self._bitmaps.get(token, 0) | bit
+        self._user_tokens[ordinal] = self._intern(self._token_sets, tokens)
+
+    @staticmethod
+    def _db_now(db: Session) -> datetime:
+        # updated_at은 UTC(naive)로 저장되므로 워터마크도 세션 TimeZone과 무관하게 UTC로 받음
+        return db.execute(select(func.timezone("UTC", func.now()))).scalar()
+
+    def _load_all(self, db: Session) -> Dict[str, Any]:
+        """전체 재구성 (연결된 응답을 스트리밍으로 읽어 비트맵 생성)"""
+        started_at = self._db_now(db)
+        ordinals: Dict[str, int] = {}
+        user_tokens: List[Set[tuple]] = []
+
+        stmt = (
+            select(*INDEX_COLUMNS)
+            .where(UserResponse.uid.isnot(None))
+            .execution_options(yield_per=1000)
+        )
+        for row in db.execute(stmt):
+            ordinal = ordinals.setdefault(row.uid, len(ordinals))
+            if ordinal == len(user_tokens):
+                user_tokens.append(set())
+            user_tokens[ordinal].update(self._row_tokens(row))
+
+        # 토큰별 비트 위치를 모아 한 번에 정수로 변환 (비트마다 큰 정수를 복사하지 않도록)
+        positions: Dict[tuple, List[int]] = {}
+        for ordinal, tokens in enumerate(user_tokens):
+            for token in tokens:
+                positions.setdefault(token, []).append(ordinal)
+        size = (len(ordinals) + 7) // 8
+        token_sets: Dict[frozenset, frozenset] = {}
+
+        return {
+            "ordinals": ordinals,
+            "user_tokens": [self._intern(token_sets, tokens) for tokens in user_tokens],
+            "token_sets": token_sets,
+            "bitmaps": {token: self._to_bitmap(ordinal_list, size) for token, ordinal_list in positions.items()},
+            "universe": self._to_bitmap(range(len(ordinals)), size),
+            "watermark": started_at
+        }
+
+    @staticmethod
+    def _to_bitmap(ordinals: Iterable[int], size: int) -> int:
+        buffer = bytearray(size)
+        for ordinal in ordinals:
+            buffer[ordinal >> 3] |= 1 << (ordinal & 7)
+        return int.from_bytes(buffer, "little")
+
+    def _load_changes(self, db: Session, since: Optional[datetime], uids: Set[str]) -> Dict[str, Any]:
+        """워터마크 이후 바뀐 행과 지정한 사용자들의 현재 응답 조회"""
+        started_at = self._db_now(db)
+        affected = set(uids)
+        if since is not None:
+            affected.update(db.execute(
+                select(UserResponse.uid.distinct())
+                .where(UserResponse.updated_at > since - SYNC_OVERLAP, UserResponse.uid.isnot(None))
+            ).scalars())
+
+        # 사용자별 현재 응답 전체로 다시 계산 (병합으로 삭제된 행도 반영됨)
+        tokens_by_uid: Dict[str, Optional[Set[tuple]]] = {uid: None for uid in affected}
+        affected_list = sorted(affected)
+        for start in range(0, len(affected_list), REFRESH_BATCH_SIZE):
+            batch = affected_list[start:start + REFRESH_BATCH_SIZE]
+            for row in db.execute(select(*INDEX_COLUMNS).where(UserResponse.uid.in_(batch))):
+                tokens = tokens_by_uid[row.uid]
+                if tokens is None:
+                    tokens = tokens_by_uid[row.uid] = set()
+                tokens.update(self._row_tokens(row))
+
+        return {"tokens_by_uid": tokens_by_uid, "watermark": started_at}
+
+    def _apply_changes(self, changes: Dict[str, Any]) -> None:
+        for uid, tokens in changes["tokens_by_uid"].items():
+            ordinal = self._ordinal(uid)
+            self._set_user(ordinal, frozenset(tokens or ()))
+            bit = 1 << ordinal
+            # 응답이 하나도 남지 않은 사용자는 전체 집합(NOT 기준)에서 제외
+            self._universe = (self._universe | bit) if tokens is not None else (self._universe & ~bit)
+        self._watermark = changes["watermark"]
+
+    async def rebuild(self) -> None:
+        """DB에서 인덱스 전체를 다시 만들기"""
+        async with self._lock:
+            await self._rebuild_locked()
+
+    async def _rebuild_locked(self) -> None:
+        start_time = time.perf_counter()
+        state = await asyncio.to_thread(run_with_session, ReadSessionLocal, self._load_all)
+        self._ordinals = state["ordinals"]
+        self._user_tokens = state["user_tokens"]
+        self._token_sets = state["token_sets"]
+        self._bitmaps = state["bitmaps"]
+        self._universe = state["universe"]
+        self._watermark = state["watermark"]
+        self._built_at = time.monotonic()
+        self.build_seconds = time.perf_counter() - start_time
+        logger.info(f"Cohort index built: {len(self._ordinals)} users, {len(self._bitmaps)} bitmaps in {self.build_seconds:.2f}s")
+
+    async def sync(self) -> None:
+        """이 워커의 변경 사용자와 워터마크 이후 변경분 반영 (아직 만들지 않았으면 전체 구성)"""
+        async with self._lock:
+            # 잠금을 기다리는 동안 다른 작업이 구성을 끝냈을 수 있으므로 잠금 안에서 확인
+            if self._watermark is None:
+                await self._rebuild_locked()
+                return
+            uids, self._dirty = self._dirty, set()
+            try:
+                # 방금 쓴 사용자를 복제 지연 없이 읽도록 증분 동기화는 primary에서 실행
+                changes = await asyncio.to_thread(run_with_session, SessionLocal, self._load_changes, self._watermark, uids)
+            except BaseException:
+                # 실패(또는 취소)하면 다음 동기화에서 다시 계산하도록 되돌림
+                self._dirty |= uids
+                raise
+            self._apply_changes(changes)
+
+    def mark_dirty(self, uid: Optional[str]) -> None:
+        """쓰기 직후 호출 (다음 조회 전에 해당 사용자를 다시 계산)
+
+        인덱스를 아직 만들지 않았으면 첫 구성에 어차피 포함되므로 기록하지 않습니다.
+        """
+        if uid and self._watermark is not None:
+            self._dirty.add(uid)
+
+    async def start(self):
+        """주기적 동기화 작업 시작 (첫 구성도 이 작업에서 하므로 앱 시작을 막지 않음)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sync_loop(self):
+        while True:
+            try:
+                if self._watermark is not None and time.monotonic() - self._built_at > self.rebuild_interval:
+                    await self.rebuild()
+                else:
+                    # 아직 만들지 않았으면 sync가 전체 구성
+                    await self.sync()
+            except Exception as e:
+                logger.warning(f"Cohort index sync failed: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+    def _evaluate(self, expression: Dict[str, Any]) -> int:
+        """{"field", "value"} / {"and": [...]} / {"or": [...]} / {"not": {...}} 식을 비트셋으로 계산"""
+        operators = [key for key in ("field", "and", "or", "not") if expression.get(key) is not None]
+        if len(operators) != 1:
+            raise ValueError("Each expression needs exactly one of field/value, and, or, not")
+
+        operator = operators[0]
+        if operator == "field":
+            field, value = expression["field"], expression.get("value")
+            if field not in OPTION_REGISTRY or value not in OPTION_REGISTRY[field]:
+                raise ValueError(f"Unknown option: {field}={value}")
+            return self._bitmaps.get((field, value), 0)
+        if operator == "not":
+            return self._universe & ~self._evaluate(expression["not"])
+
+        operands = expression[operator]
+        if not operands:
+            raise ValueError(f"'{operator}' needs at least one operand")
+        result = self._evaluate(operands[0])
+        for operand in operands[1:]:
+            result = (result & self._evaluate(operand)) if operator == "and" else (result | self._evaluate(operand))
+        return result
+
+    async def count(self, expression: Dict[str, Any]) -> Dict[str, Any]:
+        """코호트에 속한 연결 사용자 수"""
+        if self._watermark is None or self._dirty:
+            await self.sync()
+
+        start_time = time.perf_counter()
+        cohort = self._evaluate(expression)
+        return {
+            "count": cohort.bit_count(),
+            "total_users": self._universe.bit_count(),
+            "elapsed_ms": round((time.perf_counter() - start_time) * 1000, 3)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "users": self._universe.bit_count(),
+            "bitmaps": len(self._bitmaps),
+            "bitmap_bytes": sum((bitmap.bit_length() + 7) // 8 for bitmap in self._bitmaps.values()),
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+            "pending_users": len(self._dirty),
+            "last_build_ms": round(self.build_seconds * 1000, 1),
+            "background_sync": self._task is not None and not self._task.done()
+        }
+
+
+# /questions/cohorts/count 엔드포인트와 AsyncQuestionService가 함께 사용하는 워커별 인덱스
+cohort_index = CohortIndex(
+    sync_interval=settings.COHORT_INDEX_SYNC_INTERVAL,
+    rebuild_interval=settings.COHORT_INDEX_REBUILD_INTERVAL
+)
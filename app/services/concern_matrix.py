@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+from sqlalchemy import select, type_coerce
+from sqlalchemy.types import NullType
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import ReadSessionLocal, UserResponse, run_with_session
+from app.core.option_registry import OPTION_REGISTRY, CODED_ARRAY_FIELDS
+from app.services.analytics_cache import AnalyticsCache
+
+logger = logging.getLogger(__name__)
+
+# 동시 발생 행렬에 포함하는 다중 선택 건강 문제 필드
+CONCERN_MATRIX_FIELDS = (
+    "period_concerns", "body_concerns", "skin_hair_concerns", "mental_health_concerns", "diagnosed_conditions"
+)
+
+# 행렬의 행/열 순서: 필드 순서 -> 옵션 코드 순서
+CONCERN_MATRIX_OPTIONS = [
+    (field, label) for field in CONCERN_MATRIX_FIELDS for label in OPTION_REGISTRY[field].labels
+]
+
+
+def compute_concern_matrix(db: Session, chunk_size: int = 5000) -> Dict[str, Any]:
+    """연결된 응답의 옵션 쌍별 동시 발생 수와 lift 계산
+
+    응답을 chunk_size 행씩 스트리밍으로 읽어 (행 수 x 옵션 수) 원-핫 행렬 X를 만들고
+    X.T @ X를 누적합니다. 대각선은 옵션별 응답 수, 비대각선은 두 옵션을 함께 고른 응답 수이며
+    메모리는 청크 하나와 옵션 수 제곱 크기의 누적 행렬로 제한됩니다.
+
+    lift(a, b) = P(a, b) / (P(a) * P(b)) 이며, 1보다 크면 독립일 때보다 자주 함께 나타납니다.
+    """
+    start_time = time.perf_counter()
+    position = {option: column for column, option in enumerate(CONCERN_MATRIX_OPTIONS)}
+    # 코드 배열 필드는 DB 값(옵션 코드) 그대로, 나머지는 라벨로 열 위치를 찾음
+    column_index = [
+        {
+            (OPTION_REGISTRY[field].code(label) if field in CODED_ARRAY_FIELDS else label): position[(field, label)]
+            for label in OPTION_REGISTRY[field].labels
+        }
+        for field in CONCERN_MATRIX_FIELDS
+    ]
+    size = len(CONCERN_MATRIX_OPTIONS)
+    counts = np.zeros((size, size), dtype=np.int64)
+    total_responses = 0
+
+    # 행마다 라벨로 변환하는 비용을 피하려고 결과 타입 처리 없이 드라이버 값을 그대로 읽음
+    stmt = (
+        select(*(type_coerce(getattr(UserResponse, field), NullType()) for field in CONCERN_MATRIX_FIELDS))
+        .where(UserResponse.uid.isnot(None))
+        .execution_options(yield_per=chunk_size)
+    )
+    for chunk in db.execute(stmt).partitions():
+        # 선택된 (행, 열) 위치만 모아 한 번에 원-핫 행렬로 채움 (자유 입력 'Others: ...' 값은 제외)
+        rows: List[int] = []
+        columns: List[int] = []
+        for row_number, row in enumerate(chunk):
+            for values, index in zip(row, column_index):
+                for value in values or ():
+                    column = index.get(value)
+                    if column is not None:
+                        rows.append(row_number)
+                        columns.append(column)
+
+        one_hot = np.zeros((len(chunk), size), dtype=np.float32)
+        one_hot[rows, columns] = 1.0
+        # 청크 내 카운트는 float32로 정확히 표현되는 범위이므로 BLAS 행렬곱 후 정수로 누적
+        counts += (one_hot.T @ one_hot).astype(np.int64)
+        total_responses += len(chunk)
+
+    option_counts = np.diag(counts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lift = counts * total_responses / np.outer(option_counts, option_counts)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    logger.info(f"Concern matrix computed: {total_responses} responses x {size} options in {elapsed_ms:.1f}ms")
+
+    return {
+        "total_responses": total_responses,
+        "options": [
+            {"field": field, "value": label, "count": int(count)}
+            for (field, label), count in zip(CONCERN_MATRIX_OPTIONS, option_counts)
+        ],
+        "counts": counts.tolist(),
+        # 한쪽 옵션을 고른 응답이 없으면 lift는 정의되지 않음 (null)
+        "lift": [
+            [round(float(value), 4) if np.isfinite(value) else None for value in row]
+            for row in lift
+        ],
+        "elapsed_ms": round(elapsed_ms, 1)
+    }
+
+
+async def load_concern_matrix() -> Dict[str, Any]:
+    """읽기 복제본에서 동시 발생 행렬 계산 (캐시 갱신용)
+
+    행 디코딩과 행렬 계산이 CPU를 오래 쓰므로 이벤트 루프가 아닌 워커 스레드에서 실행합니다.
+    """
+    return await asyncio.to_thread(
+        run_with_session, ReadSessionLocal, compute_concern_matrix, settings.CONCERN_MATRIX_CHUNK_SIZE
+    )
+
+
+# /questions/analytics/concern-matrix 엔드포인트가 사용하는 워커별 캐시
+concern_matrix_cache = AnalyticsCache(
+    ttl=settings.CONCERN_MATRIX_CACHE_TTL,
+    stale_ttl=settings.CONCERN_MATRIX_CACHE_STALE_TTL
+)
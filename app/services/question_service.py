@@ -1,40 +1,161 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from app.core.database import QuestionSession, UserResponse, generate_session_id
-from app.models.question_models import UserResponseData, SessionCreate
-from typing import Optional, List, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, func, null, select, literal, cast, update, delete, bindparam, any_, distinct, tuple_, String, ARRAY
+from sqlalchemy.dialects.postgresql import insert
+from app.core.config import settings
+from app.core.database import QuestionSession, UserResponse, generate_session_id, recent_writes
+from app.services.analytics_rollup import AnalyticsRollup, concern_codes
+from app.services.analytics_sketches import AnalyticsSketches
+from app.services.analytics_timeseries import record_timeseries_event
+from app.services.cohort_index import cohort_index
+from app.core.option_registry import OPTION_REGISTRY
+from app.models.question_models import UserResponseData, SessionCreate, BulkQuestionnaireItem
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
+import base64
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 설문 응답 필드 (UserResponseData와 UserResponse 컬럼에 공통)
+RESPONSE_FIELDS = (
+    "name", "age", "period_description", "birth_control", "last_period_date", "cycle_length",
+    "period_concerns", "body_concerns", "skin_hair_concerns", "mental_health_concerns",
+    "other_concerns", "top_concern", "diagnosed_conditions"
+)
+
+# 세션 병합 시 한 번에 가져올 행 수
+MERGE_FETCH_SIZE = 100
+
+
+def encode_response_cursor(created_at: datetime, response_id: int) -> str:
+    """마지막 행의 (created_at, id)를 불투명한 커서 문자열로 인코딩"""
+    payload = json.dumps([created_at.isoformat(), response_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_response_cursor(cursor: str) -> Tuple[datetime, int]:
+    """커서 문자열을 (created_at, id)로 디코딩 (형식이 잘못되면 ValueError)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, response_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(response_id, int):
+            raise ValueError("id must be an integer")
+        return datetime.fromisoformat(created_at), response_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
+
 class QuestionService:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_session(self, device_id: str, uid: Optional[str] = None) -> str:
-        """Create new question session"""
+    def create_session(self, device_id: str, uid: Optional[str] = None) -> QuestionSession:
+        """Create new question session (INSERT ... RETURNING, no re-read)"""
         try:
-            session_id = generate_session_id()
-            
-            session = QuestionSession(
-                session_id=session_id,
+            stmt = insert(QuestionSession).values(
+                session_id=generate_session_id(),
                 uid=uid,
                 device_id=device_id,
-                status="in_progress"
-            )
+                status="in_progress",
+                created_at=datetime.utcnow()
+            ).returning(QuestionSession)
             
-            self.db.add(session)
+            session = self.db.scalars(stmt).one()
             self.db.commit()
             
-            logger.info(f"New session created: {session_id}, device: {device_id}")
-            return session_id
+            logger.info(f"New session created: {session.session_id}, device: {device_id}")
+            return session
             
         except Exception as e:
             self.db.rollback()
             logger.error(f"Session creation failed: {str(e)}")
             raise Exception(f"Session creation failed: {str(e)}")
 
+    def ingest_questionnaires(self, items: List[BulkQuestionnaireItem]) -> List[Tuple[str, Optional[int], str]]:
+        """오프라인 설문 일괄 저장 -> 항목 순서대로 (session_id, response_id, status)
+
+        세션과 응답을 각각 다중 행 INSERT로 한 트랜잭션에서 저장하므로 항목 수와 무관하게
+        왕복 몇 번과 커밋 한 번으로 끝나고, 롤업 트리거도 문장당 한 번만 실행됩니다.
+        클라이언트가 session_id를 보내면 ON CONFLICT DO NOTHING으로 저장하므로 같은 요청을 다시 보내도
+        중복 세션이 생기지 않습니다 (status: created / already_created, 다른 디바이스의 세션이면 conflict).
+        """
+        try:
+            now = datetime.utcnow()
+            sessions = [
+                {
+                    "session_id": item.session_id or generate_session_id(),
+                    "uid": None,
+                    "device_id": item.device_id,
+                    "status": "in_progress",
+                    "created_at": item.collected_at or now
+                }
+                for item in items
+            ]
+            inserted = set(self.db.scalars(
+                insert(QuestionSession.__table__)
+                .on_conflict_do_nothing(index_elements=["session_id"])
+                .returning(QuestionSession.__table__.c.session_id),
+                sessions
+            ))
+            
+            # 같은 요청 안에서 session_id가 반복되면 첫 항목만 새로 저장
+            new_indexes = []
+            for index, session in enumerate(sessions):
+                if session["session_id"] in inserted:
+                    inserted.discard(session["session_id"])
+                    new_indexes.append(index)
+            
+            response_ids: Dict[str, int] = {}
+            if new_indexes:
+                response_ids = dict(self.db.execute(
+                    insert(UserResponse.__table__)
+                    .on_conflict_do_nothing(index_elements=["session_id"])
+                    .returning(UserResponse.__table__.c.session_id, UserResponse.__table__.c.id),
+                    [
+                        {
+                            "session_id": sessions[index]["session_id"],
+                            "uid": None,
+                            "created_at": sessions[index]["created_at"],
+                            "updated_at": now,
+                            **{field: getattr(items[index].responses, field) for field in RESPONSE_FIELDS}
+                        }
+                        for index in new_indexes
+                    ]
+                ).all())
+            
+            # 이미 있던 세션(같은 요청 안의 반복 포함)은 디바이스가 같을 때만 같은 설문의 재전송으로 보고 기존 응답 ID를 돌려줌
+            new_index_set = set(new_indexes)
+            existing_ids = {session["session_id"] for index, session in enumerate(sessions) if index not in new_index_set}
+            existing = {}
+            if existing_ids:
+                existing = {
+                    row.session_id: row for row in self.db.execute(
+                        select(QuestionSession.session_id, QuestionSession.device_id, UserResponse.id.label("response_id"))
+                        .outerjoin(UserResponse, UserResponse.session_id == QuestionSession.session_id)
+                        .where(QuestionSession.session_id.in_(existing_ids))
+                    )
+                }
+            
+            self.db.commit()
+            
+            results = []
+            for index, session in enumerate(sessions):
+                session_id = session["session_id"]
+                if index in new_index_set:
+                    results.append((session_id, response_ids.get(session_id), "created"))
+                elif existing.get(session_id) is not None and existing[session_id].device_id == session["device_id"]:
+                    results.append((session_id, existing[session_id].response_id, "already_created"))
+                else:
+                    results.append((session_id, None, "conflict"))
+            logger.info(f"Bulk ingest: {len(new_indexes)} of {len(items)} sessions created")
+            return results
+            
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Bulk ingest failed: {str(e)}")
+            raise Exception(f"설문 일괄 저장 실패: {str(e)}")
+
     def get_session(self, session_id: str) -> Optional[QuestionSession]:
         """Get session"""
         try:
@@ -45,120 +166,181 @@ class QuestionService:
             logger.error(f"Session retrieval failed: {str(e)}")
             raise Exception(f"Session retrieval failed: {str(e)}")
 
-    def link_session_to_user(self, session_id: str, uid: str) -> bool:
-        """세션을 사용자와 연결"""
+    def link_session_to_user(self, session_id: str, uid: str) -> Dict[str, int]:
+        """세션을 사용자와 연결 (세션과 응답을 집합 단위 UPDATE로 한 트랜잭션에서 처리)"""
         try:
-            session = self.get_session(session_id)
-            if not session:
+            sessions_linked = self.db.execute(
+                update(QuestionSession)
+                .where(QuestionSession.session_id == session_id)
+                .values(uid=uid, status="linked", completed_at=datetime.utcnow()),
+                execution_options={"synchronize_session": False}
+            ).rowcount
+            if not sessions_linked:
                 raise Exception("세션을 찾을 수 없습니다")
             
-            # Update uid of existing session
-            session.uid = uid
-            session.status = "linked"
-            session.completed_at = datetime.utcnow()
-            
-            # 관련된 응답들도 uid 업데이트
-            responses = self.db.query(UserResponse).filter(
-                UserResponse.session_id == session_id
-            ).all()
-            
-            for response in responses:
-                response.uid = uid
+            # 관련된 응답들도 uid 업데이트 (ORM 객체 로드 없이)
+            responses_linked = self.db.execute(
+                update(UserResponse)
+                .where(UserResponse.session_id == session_id)
+                .values(uid=uid, updated_at=datetime.utcnow()),
+                execution_options={"synchronize_session": False}
+            ).rowcount
             
             self.db.commit()
-            logger.info(f"Session {session_id} linked to user {uid}")
-            return True
+            logger.info(f"Session {session_id} linked to user {uid} ({responses_linked} responses)")
+            return {"sessions_linked": sessions_linked, "responses_linked": responses_linked}
             
         except Exception as e:
             self.db.rollback()
             logger.error(f"Session linking failed: {str(e)}")
             raise Exception(f"세션 연결 실패: {str(e)}")
 
-    def save_user_responses(self, session_id: str, responses: UserResponseData, uid: Optional[str] = None) -> UserResponse:
-        """사용자 응답 저장"""
+    def _upsert_response(self, session_id: str, fields: Dict[str, Any], uid: Optional[str] = None) -> Optional[UserResponse]:
+        """세션 존재 확인 + 생성/업데이트 한 문장 (커밋은 호출한 쪽에서)
+
+        fields에 있는 컬럼만 INSERT/UPDATE 대상에 넣으므로(None이면 NULL로 지움) 바뀌지 않은
+        JSONB/배열 컬럼은 다시 쓰지 않습니다. 세션이 없으면 None을 반환합니다.
+        """
+        now = datetime.utcnow()
+        # None은 JSON null이 아닌 SQL NULL로 보내야 함
+        values = {
+            "session_id": QuestionSession.session_id,
+            "uid": uid,
+            "created_at": now,
+            "updated_at": now,
+            **{field: fields[field] for field in RESPONSE_FIELDS if field in fields}
+        }
+        columns = [
+            value if field == "session_id"
+            else cast(null(), UserResponse.__table__.c[field].type) if value is None
+            else literal(value, UserResponse.__table__.c[field].type)
+            for field, value in values.items()
+        ]
+        
+        # INSERT ... SELECT FROM question_sessions: 세션이 없으면 0행
+        # FOR KEY SHARE로 세션 행을 잡아 두므로 정리 작업(session_purge)이 같은 세션을 동시에 지우지 못함
+        stmt = insert(UserResponse).from_select(
+            list(values.keys()),
+            select(*columns).where(QuestionSession.session_id == session_id).with_for_update(key_share=True)
+        )
+        # 넘겨받은 필드만 덮어쓰기 (uid는 이미 연결된 값을 유지)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserResponse.session_id],
+            set_={
+                **{field: stmt.excluded[field] for field in RESPONSE_FIELDS if field in fields},
+                "uid": func.coalesce(stmt.excluded.uid, UserResponse.uid),
+                "updated_at": stmt.excluded.updated_at
+            }
+        ).returning(UserResponse)
+        
+        return self.db.scalars(stmt, execution_options={"populate_existing": True}).one_or_none()
+
+    def save_user_responses(self, session_id: str, responses: UserResponseData, uid: Optional[str] = None) -> Optional[UserResponse]:
+        """사용자 응답 저장 (세션 존재 확인 + 생성/업데이트를 한 문장으로 처리)
+
+        세션이 없으면 아무 행도 쓰지 않고 None을 반환합니다.
+        """
         try:
-            # 기존 응답이 있는지 확인
-            existing_response = self.db.query(UserResponse).filter(
-                UserResponse.session_id == session_id
-            ).first()
-            
-            if existing_response:
-                # 기존 응답 업데이트
-                self._update_response_fields(existing_response, responses)
-                existing_response.uid = uid or existing_response.uid
-                existing_response.updated_at = datetime.utcnow()
-                self.db.commit()
-                logger.info(f"Response updated: session {session_id}")
-                return existing_response
+            # None인 필드는 기존 값을 유지 (보낸 필드만 쓰기)
+            saved_response = self._upsert_response(
+                session_id, responses.model_dump(include=set(RESPONSE_FIELDS), exclude_none=True), uid
+            )
+            self.db.commit()
+            if saved_response is None:
+                logger.info(f"Response not saved, session not found: {session_id}")
             else:
-                # 새 응답 생성
-                new_response = UserResponse(
-                    session_id=session_id,
-                    uid=uid,
-                    name=responses.name,
-                    age=responses.age,
-                    period_description=responses.period_description,
-                    birth_control=responses.birth_control,
-                    last_period_date=responses.last_period_date,
-                    cycle_length=responses.cycle_length,
-                    period_concerns=responses.period_concerns,
-                    body_concerns=responses.body_concerns,
-                    skin_hair_concerns=responses.skin_hair_concerns,
-                    mental_health_concerns=responses.mental_health_concerns,
-                    other_concerns=responses.other_concerns,
-                    top_concern=responses.top_concern,
-                    diagnosed_conditions=responses.diagnosed_conditions
-                )
-                
-                self.db.add(new_response)
-                self.db.commit()
-                logger.info(f"New response saved: session {session_id}")
-                return new_response
+                logger.info(f"Response saved: session {session_id}")
+            return saved_response
                 
         except Exception as e:
             self.db.rollback()
             logger.error(f"Response save failed: {str(e)}")
             raise Exception(f"응답 저장 실패: {str(e)}")
 
-    def _update_response_fields(self, response: UserResponse, new_data: UserResponseData):
-        """응답 필드 업데이트 (None이 아닌 값만)"""
-        if new_data.name is not None:
-            response.name = new_data.name
-        if new_data.age is not None:
-            response.age = new_data.age
-        if new_data.period_description is not None:
-            response.period_description = new_data.period_description
-        if new_data.birth_control is not None:
-            response.birth_control = new_data.birth_control
-        if new_data.last_period_date is not None:
-            response.last_period_date = new_data.last_period_date
-        if new_data.cycle_length is not None:
-            response.cycle_length = new_data.cycle_length
-        if new_data.period_concerns is not None:
-            response.period_concerns = new_data.period_concerns
-        if new_data.body_concerns is not None:
-            response.body_concerns = new_data.body_concerns
-        if new_data.skin_hair_concerns is not None:
-            response.skin_hair_concerns = new_data.skin_hair_concerns
-        if new_data.mental_health_concerns is not None:
-            response.mental_health_concerns = new_data.mental_health_concerns
-        if new_data.other_concerns is not None:
-            response.other_concerns = new_data.other_concerns
-        if new_data.top_concern is not None:
-            response.top_concern = new_data.top_concern
-        if new_data.diagnosed_conditions is not None:
-            response.diagnosed_conditions = new_data.diagnosed_conditions
+    def save_user_responses_batch(
+        self, entries: Dict[str, Tuple[Dict[str, Any], Optional[str]]]
+    ) -> Dict[str, Any]:
+        """여러 세션의 응답을 한 트랜잭션에서 저장하고 한 번만 커밋 (그룹 커밋용)
+
+        entries는 session_id -> (쓸 필드 값, uid)이며, 결과는 session_id -> 저장된 행
+        (세션이 없으면 None)입니다. 배치가 실패하면 세션별로 따로 커밋해 다시 시도하고,
+        그래도 실패한 세션에는 예외 객체를 담아 돌려줍니다.
+
+        세션은 session_id 순으로 저장하므로 겹치는 배치를 동시에 flush하는 워커들도
+        행 잠금을 같은 순서로 잡아 서로 교착되지 않습니다.
+        """
+        ordered = sorted(entries.items())
+        try:
+            results = {
+                session_id: self._upsert_response(session_id, values, uid)
+                for session_id, (values, uid) in ordered
+            }
+            self.db.commit()
+            logger.info(f"Responses saved in one commit: {len(entries)} sessions")
+            return results
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"Batched response save failed, retrying per session: {str(e)}")
+        
+        results = {}
+        for session_id, (values, uid) in ordered:
+            try:
+                results[session_id] = self._upsert_response(session_id, values, uid)
+                self.db.commit()
+            except Exception as e:
+                self.db.rollback()
+                logger.error(f"Response save failed: {str(e)}")
+                results[session_id] = Exception(f"응답 저장 실패: {str(e)}")
+        return results
+
+    def update_response_field(self, session_id: str, field: str, value: Any) -> Optional[UserResponse]:
+        """질문 하나의 값만 저장 (UPDATE는 해당 컬럼과 updated_at만 변경, 세션이 없으면 None)"""
+        try:
+            saved_response = self._upsert_response(session_id, {field: value})
+            self.db.commit()
+            return saved_response
+                
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Response field update failed: {str(e)}")
+            raise Exception(f"응답 필드 저장 실패: {str(e)}")
 
     def get_user_responses(self, uid: str) -> List[UserResponse]:
         """사용자의 모든 응답 조회"""
         try:
             return self.db.query(UserResponse).filter(
                 UserResponse.uid == uid
-            ).order_by(UserResponse.created_at.desc()).all()
+            ).order_by(UserResponse.created_at.desc(), UserResponse.id.desc()).all()
         except Exception as e:
             logger.error(f"User response retrieval failed: {str(e)}")
             raise Exception(f"사용자 응답 조회 실패: {str(e)}")
 
+    def get_user_responses_page(
+        self, uid: str, limit: int, after: Optional[Tuple[datetime, int]] = None
+    ) -> Tuple[List[UserResponse], Optional[Tuple[datetime, int]]]:
+        """사용자 응답을 최신순으로 limit개 조회 (created_at, id 키셋 페이지네이션)
+
+        after는 이전 페이지 마지막 행의 (created_at, id)이며, 다음 페이지가 있으면
+        이번 페이지 마지막 행의 키를 함께 반환합니다.
+        """
+        try:
+            stmt = select(UserResponse).where(UserResponse.uid == uid)
+            if after is not None:
+                stmt = stmt.where(tuple_(UserResponse.created_at, UserResponse.id) < tuple_(*after))
+            stmt = stmt.order_by(UserResponse.created_at.desc(), UserResponse.id.desc()).limit(limit + 1)
+
+            # 한 행을 더 읽어 다음 페이지 존재 여부 판단 (COUNT 쿼리 없음)
+            responses = list(self.db.scalars(stmt))
+            if len(responses) <= limit:
+                return responses, None
+
+            responses = responses[:limit]
+            last = responses[-1]
+            return responses, (last.created_at, last.id)
+        except Exception as e:
+            logger.error(f"User response page retrieval failed: {str(e)}")
+            raise Exception(f"사용자 응답 조회 실패: {str(e)}")
+
     def get_session_responses(self, session_id: str) -> Optional[UserResponse]:
         """세션의 응답 조회"""
         try:
@@ -170,39 +352,62 @@ class QuestionService:
             raise Exception(f"세션 응답 조회 실패: {str(e)}")
 
     def merge_user_sessions(self, uid: str, session_ids: List[str]) -> bool:
-        """여러 세션을 하나의 사용자로 병합"""
+        """여러 세션을 하나의 사용자로 병합
+
+        후보 응답을 IN 쿼리 한 번으로 최신순 스트리밍하며 한 번에 병합하고,
+        나머지 응답은 DELETE 한 번으로 삭제합니다. 메모리에는 병합 중인 레코드 하나만 유지합니다.
+        """
         try:
-            # Collect response data from all sessions
-            all_responses = []
-            for session_id in session_ids:
-                response = self.get_session_responses(session_id)
-                if response:
-                    all_responses.append(response)
+            # 세션 ID 목록은 배열 파라미터 하나로 전달 (목록 길이와 무관하게 쿼리 크기 일정)
+            session_ids_param = bindparam("session_ids", list(dict.fromkeys(session_ids)), type_=ARRAY(String))
             
-            if not all_responses:
-                return False
+            rows = self.db.execute(
+                select(UserResponse.id, *[getattr(UserResponse, field) for field in RESPONSE_FIELDS])
+                .where(UserResponse.session_id == any_(session_ids_param))
+                .order_by(UserResponse.created_at.desc(), UserResponse.id.desc())
+                .execution_options(yield_per=MERGE_FETCH_SIZE)
+            )
+            
+            # 가장 최신 응답을 기준으로, 비어 있는 필드만 다른 세션 값으로 채움
+            target_id = None
+            merged = {}
+            for row in rows:
+                if target_id is None:
+                    target_id = row.id
+                    merged = {field: getattr(row, field) for field in RESPONSE_FIELDS}
+                    continue
+                for field in RESPONSE_FIELDS:
+                    value = getattr(row, field)
+                    if value and not merged[field]:
+                        merged[field] = value
             
-            # 가장 최신 응답을 기준으로 병합
-            latest_response = max(all_responses, key=lambda x: x.created_at)
+            if target_id is None:
+                return False
             
-            # Merge data from other sessions into the latest response
-            for response in all_responses:
-                if response.id != latest_response.id:
-                    self._merge_response_data(latest_response, response)
+            # 최신 응답 업데이트 (병합 결과 + uid)
+            self.db.execute(
+                update(UserResponse)
+                .where(UserResponse.id == target_id)
+                .values(
+                    **{field: value if value is not None else null() for field, value in merged.items()},
+                    uid=uid,
+                    updated_at=datetime.utcnow()
+                ),
+                execution_options={"synchronize_session": False}
+            )
             
-            # 최신 응답의 uid 업데이트
-            latest_response.uid = uid
-            latest_response.updated_at = datetime.utcnow()
+            # Delete other sessions' responses
+            deleted = self.db.execute(
+                delete(UserResponse)
+                .where(UserResponse.session_id == any_(session_ids_param), UserResponse.id != target_id),
+                execution_options={"synchronize_session": False}
+            ).rowcount
             
-            # Delete other sessions
-            for session_id in session_ids:
-                if session_id != latest_response.session_id:
-                    self.db.query(UserResponse).filter(
-                        UserResponse.session_id == session_id
-                    ).delete()
+            # 병합은 남는 타임스탬프가 없으므로 같은 트랜잭션에서 시계열 카운터 증가
+            record_timeseries_event(self.db, "merges")
             
             self.db.commit()
-            logger.info(f"Session merge completed: user {uid}")
+            logger.info(f"Session merge completed: user {uid} ({deleted} responses merged away)")
             return True
             
         except Exception as e:
@@ -210,54 +415,32 @@ class QuestionService:
             logger.error(f"Session merge failed: {str(e)}")
             raise Exception(f"세션 병합 실패: {str(e)}")
 
-    def _merge_response_data(self, target: UserResponse, source: UserResponse):
-        """응답 데이터 병합 (None이 아닌 값만)"""
-        if source.name and not target.name:
-            target.name = source.name
-        if source.age and not target.age:
-            target.age = source.age
-        if source.period_description and not target.period_description:
-            target.period_description = source.period_description
-        if source.birth_control and not target.birth_control:
-            target.birth_control = source.birth_control
-        if source.last_period_date and not target.last_period_date:
-            target.last_period_date = source.last_period_date
-        if source.cycle_length and not target.cycle_length:
-            target.cycle_length = source.cycle_length
-        if source.period_concerns and not target.period_concerns:
-            target.period_concerns = source.period_concerns
-        if source.body_concerns and not target.body_concerns:
-            target.body_concerns = source.body_concerns
-        if source.skin_hair_concerns and not target.skin_hair_concerns:
-            target.skin_hair_concerns = source.skin_hair_concerns
-        if source.mental_health_concerns and not target.mental_health_concerns:
-            target.mental_health_concerns = source.mental_health_concerns
-        if source.other_concerns and not target.other_concerns:
-            target.other_concerns = source.other_concerns
-        if source.top_concern and not target.top_concern:
-            target.top_concern = source.top_concern
-        if source.diagnosed_conditions and not target.diagnosed_conditions:
-            target.diagnosed_conditions = source.diagnosed_conditions
-
-    def get_analytics(self) -> Dict[str, Any]:
-        """분석 데이터 조회"""
+    def get_analytics(self, approximate: bool = False) -> Dict[str, Any]:
+        """분석 데이터 조회 (롤업 테이블 또는 DB GROUP BY 집계)
+
+        approximate=True면 total_users와 나이 분포를 analytics_sketches의 HyperLogLog/t-digest에서
+        근사값으로 계산하고 나이 분위수를 함께 반환합니다.
+        """
         try:
+            if approximate:
+                return self._get_approximate_analytics()
+            
+            if settings.ANALYTICS_USE_ROLLUPS:
+                return AnalyticsRollup(self.db).read()
+            
             # 총 사용자 수
-            total_users = self.db.query(UserResponse).filter(
-                UserResponse.uid.isnot(None)
-            ).distinct(UserResponse.uid).count()
+            total_users = self.db.execute(
+                select(func.count(distinct(UserResponse.uid))).where(UserResponse.uid.isnot(None))
+            ).scalar()
             
-            # 나이 분포
-            age_distribution = {}
-            age_responses = self.db.query(UserResponse.age).filter(
-                and_(UserResponse.age.isnot(None), UserResponse.uid.isnot(None))
+            # 나이 분포 (10세 단위 구간)
+            age_group = ((UserResponse.age // 10) * 10).label("age_group")
+            age_rows = self.db.execute(
+                select(age_group, func.count())
+                .where(UserResponse.age > 0, UserResponse.uid.isnot(None))
+                .group_by(age_group)
             ).all()
-            
-            for age_response in age_responses:
-                age = age_response[0]
-                if age:
-                    age_group = f"{(age // 10) * 10}대"
-                    age_distribution[age_group] = age_distribution.get(age_group, 0) + 1
+            age_distribution = {f"{row[0]}대": row[1] for row in age_rows}
             
             # 건강 문제 통계
             period_concerns_stats = self._get_concerns_stats("period_concerns")
@@ -276,31 +459,111 @@ class QuestionService:
             logger.error(f"Analytics data retrieval failed: {str(e)}")
             raise Exception(f"분석 데이터 조회 실패: {str(e)}")
 
+    def _get_approximate_analytics(self) -> Dict[str, Any]:
+        """스케치 기반 근사 분석 (건강 문제 통계는 정확한 값)"""
+        if settings.ANALYTICS_USE_ROLLUPS:
+            analytics = AnalyticsRollup(self.db).read()
+        else:
+            analytics = {
+                "period_concerns_stats": self._get_concerns_stats("period_concerns"),
+                "body_concerns_stats": self._get_concerns_stats("body_concerns"),
+                "top_concerns_stats": self._get_top_concerns_stats()
+            }
+        return {**analytics, **AnalyticsSketches(self.db).read(), "approximate": True}
+
     def _get_concerns_stats(self, field_name: str) -> Dict[str, int]:
-        """특정 건강 문제 필드의 통계"""
-        stats = {}
-        responses = self.db.query(getattr(UserResponse, field_name)).filter(
-            and_(getattr(UserResponse, field_name).isnot(None), UserResponse.uid.isnot(None))
-        ).all()
+        """특정 건강 문제 필드의 통계 (옵션 코드 배열을 unnest로 펼쳐 집계 후 라벨로 변환)"""
+        column = getattr(UserResponse, field_name)
+        concerns = select(
+            concern_codes(column).label("concern")
+        ).where(column.isnot(None), UserResponse.uid.isnot(None)).subquery()
         
-        for response in responses:
-            concerns = response[0]
-            if concerns:
-                for concern in concerns:
-                    stats[concern] = stats.get(concern, 0) + 1
-        
-        return stats
+        rows = self.db.execute(
+            select(concerns.c.concern, func.count()).group_by(concerns.c.concern)
+        ).all()
+        option_set = OPTION_REGISTRY[field_name]
+        return {option_set.label(row[0]): row[1] for row in rows}
 
     def _get_top_concerns_stats(self) -> Dict[str, int]:
         """최우선 문제 통계"""
-        stats = {}
-        responses = self.db.query(UserResponse.top_concern).filter(
-            and_(UserResponse.top_concern.isnot(None), UserResponse.uid.isnot(None))
+        rows = self.db.execute(
+            select(UserResponse.top_concern, func.count())
+            .where(UserResponse.top_concern.isnot(None), UserResponse.top_concern != "", UserResponse.uid.isnot(None))
+            .group_by(UserResponse.top_concern)
         ).all()
-        
-        for response in responses:
-            concern = response[0]
-            if concern:
-                stats[concern] = stats.get(concern, 0) + 1
-        
-        return stats 
\ No newline at end of file
+        return {row[0]: row[1] for row in rows}
+
+
+class AsyncQuestionService:
+    """QuestionService의 비동기 버전
+
+    AsyncSession.run_sync로 QuestionService의 로직을 그대로 실행합니다.
+    쿼리 I/O는 asyncpg를 통해 이벤트 루프에 양보하므로 느린 쿼리가 다른 요청을 막지 않습니다.
+    쓰기 메서드는 커밋 후 recent_writes에 기록해 get_read_db가 직후 읽기를 primary로 보내게 하고,
+    연결된 사용자의 변경은 cohort_index에 알립니다.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _run(self, method_name: str, *args):
+        return await self.db.run_sync(
+            lambda session: getattr(QuestionService(session), method_name)(*args)
+        )
+
+    async def create_session(self, device_id: str, uid: Optional[str] = None) -> QuestionSession:
+        session = await self._run("create_session", device_id, uid)
+        recent_writes.mark(session_id=session.session_id, uid=uid)
+        return session
+
+    async def ingest_questionnaires(self, items: List[BulkQuestionnaireItem]) -> List[Tuple[str, Optional[int], str]]:
+        results = await self._run("ingest_questionnaires", items)
+        for session_id, _, result_status in results:
+            if result_status == "created":
+                recent_writes.mark(session_id=session_id)
+        return results
+
+    async def get_session(self, session_id: str) -> Optional[QuestionSession]:
+        return await self._run("get_session", session_id)
+
+    async def link_session_to_user(self, session_id: str, uid: str) -> Dict[str, int]:
+        result = await self._run("link_session_to_user", session_id, uid)
+        recent_writes.mark(session_id=session_id, uid=uid)
+        cohort_index.mark_dirty(uid)
+        return result
+
+    async def save_user_responses(self, session_id: str, responses: UserResponseData, uid: Optional[str] = None) -> Optional[UserResponse]:
+        user_response = await self._run("save_user_responses", session_id, responses, uid)
+        if user_response is not None:
+            recent_writes.mark(session_id=session_id, uid=user_response.uid)
+            cohort_index.mark_dirty(user_response.uid)
+        return user_response
+
+    async def update_response_field(self, session_id: str, field: str, value: Any) -> Optional[UserResponse]:
+        user_response = await self._run("update_response_field", session_id, field, value)
+        if user_response is not None:
+            recent_writes.mark(session_id=session_id, uid=user_response.uid)
+            cohort_index.mark_dirty(user_response.uid)
+        return user_response
+
+    async def get_user_responses(self, uid: str) -> List[UserResponse]:
+        return await self._run("get_user_responses", uid)
+
+    async def get_user_responses_page(
+        self, uid: str, limit: int, after: Optional[Tuple[datetime, int]] = None
+    ) -> Tuple[List[UserResponse], Optional[Tuple[datetime, int]]]:
+        return await self._run("get_user_responses_page", uid, limit, after)
+
+    async def get_session_responses(self, session_id: str) -> Optional[UserResponse]:
+        return await self._run("get_session_responses", session_id)
+
+    async def merge_user_sessions(self, uid: str, session_ids: List[str]) -> bool:
+        merged = await self._run("merge_user_sessions", uid, session_ids)
+        recent_writes.mark(uid=uid)
+        cohort_index.mark_dirty(uid)
+        for session_id in session_ids:
+            recent_writes.mark(session_id=session_id)
+        return merged
+
+    async def get_analytics(self, approximate: bool = False) -> Dict[str, Any]:
+        return await self._run("get_analytics", approximate)
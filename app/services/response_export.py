@@ -0,0 +1,208 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.database import AsyncReadSessionLocal, QuestionSession, UserResponse
+from app.services.question_service import RESPONSE_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# 내보내기 한 번에 DB에서 가져오는 행 수 (Parquet는 이 단위로 row group 생성)
+EXPORT_BATCH_SIZE = 5000
+
+# 응답 컬럼 + 세션 컬럼 (세션 컬럼은 이름이 겹치지 않도록 session_ 접두사)
+EXPORT_COLUMNS = [
+    UserResponse.id,
+    UserResponse.session_id,
+    UserResponse.uid,
+    *[getattr(UserResponse, field) for field in RESPONSE_FIELDS],
+    UserResponse.created_at,
+    UserResponse.updated_at,
+    QuestionSession.device_id.label("device_id"),
+    QuestionSession.status.label("session_status"),
+    QuestionSession.created_at.label("session_created_at"),
+    QuestionSession.completed_at.label("session_completed_at"),
+]
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+# 배열로 내보내는 다중 선택 필드
+LIST_FIELDS = (
+    "birth_control", "period_concerns", "body_concerns", "skin_hair_concerns",
+    "mental_health_concerns", "other_concerns", "diagnosed_conditions"
+)
+DATETIME_FIELDS = ("created_at", "updated_at", "session_created_at", "session_completed_at")
+
+
+def build_export_query(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    linked_only: bool = False,
+    batch_size: int = EXPORT_BATCH_SIZE
+):
+    """user_responses + question_sessions 내보내기 쿼리 (응답 created_at 기준 [start, end))
+
+    yield_per로 서버 측 커서에서 batch_size 행씩 가져오므로 테이블 크기와 무관하게
+    메모리에는 한 배치만 유지됩니다.
+    """
+    stmt = (
+        select(*EXPORT_COLUMNS)
+        .select_from(UserResponse)
+        .outerjoin(QuestionSession, QuestionSession.session_id == UserResponse.session_id)
+    )
+    if start is not None:
+        stmt = stmt.where(UserResponse.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(UserResponse.created_at < end)
+    if linked_only:
+        stmt = stmt.where(UserResponse.uid.isnot(None))
+    return stmt.order_by(UserResponse.id).execution_options(yield_per=batch_size)
+
+
+def iter_export_batches(db: Session, **filters) -> Iterator[List[Dict[str, Any]]]:
+    """동기 세션에서 배치 단위로 행 읽기 (CLI용)"""
+    for partition in db.execute(build_export_query(**filters)).partitions():
+        yield [dict(row._mapping) for row in partition]
+
+
+async def stream_export(encoder, **filters) -> AsyncIterator[bytes]:
+    """읽기 복제본의 서버 측 커서에서 배치 단위로 읽어 인코딩한 바이트를 차례로 반환 (API용)"""
+    exported = 0
+    async with AsyncReadSessionLocal() as db:
+        yield encoder.begin()
+        result = await db.stream(build_export_query(**filters))
+        async for partition in result.partitions():
+            rows = [dict(row._mapping) for row in partition]
+            exported += len(rows)
+            yield encoder.encode(rows)
+        yield encoder.end()
+    logger.info(f"Response export finished: {exported} rows as {encoder.extension}")
+
+
+class NdjsonEncoder:
+    """한 줄에 JSON 객체 하나"""
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def begin(self) -> bytes:
+        return b""
+
+    def encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        return "".join(
+            json.dumps(row, ensure_ascii=False, default=_json_default) + "\n" for row in rows
+        ).encode("utf-8")
+
+    def end(self) -> bytes:
+        return b""
+
+
+class CsvEncoder:
+    """헤더 + 행 (배열 필드는 JSON 배열 문자열)"""
+    media_type = "text/csv"
+    extension = "csv"
+
+    def begin(self) -> bytes:
+        return self._write([EXPORT_FIELDS])
+
+    def encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        return self._write(
+            [
+                [
+                    json.dumps(row[field], ensure_ascii=False) if field in LIST_FIELDS and row[field] is not None
+                    else row[field].isoformat() if field in DATETIME_FIELDS and row[field] is not None
+                    else row[field]
+                    for field in EXPORT_FIELDS
+                ]
+                for row in rows
+            ]
+        )
+
+    def end(self) -> bytes:
+        return b""
+
+    @staticmethod
+    def _write(rows: Iterable[List[Any]]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """ParquetWriter가 쓴 바이트를 모아 두었다가 꺼내 가는 버퍼"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ParquetEncoder:
+    """배치마다 row group 하나를 쓰는 Parquet (pyarrow 필요)"""
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet export requires pyarrow")
+
+        self._pa = pa
+        string_list = pa.list_(pa.string())
+        timestamp = pa.timestamp("us")
+        types = {"id": pa.int64(), "age": pa.int32()}
+        types.update({field: string_list for field in LIST_FIELDS})
+        types.update({field: timestamp for field in DATETIME_FIELDS})
+        # 첫 배치에 값이 모두 비어도 row group마다 같은 스키마가 되도록 명시
+        self.schema = pa.schema([(field, types.get(field, pa.string())) for field in EXPORT_FIELDS])
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(self._sink, self.schema, compression="zstd")
+
+    def begin(self) -> bytes:
+        return self._sink.drain()
+
+    def encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self.schema))
+        return self._sink.drain()
+
+    def end(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+EXPORT_FORMATS = {"ndjson": NdjsonEncoder, "csv": CsvEncoder, "parquet": ParquetEncoder}
+
+
+def get_encoder(export_format: str):
+    """형식 이름으로 인코더 생성 (지원하지 않으면 ValueError)"""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    return EXPORT_FORMATS[export_format]()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, UserResponse, recent_writes
+from app.models.question_models import UserResponseData
+from app.services.cohort_index import cohort_index
+from app.services.question_service import QuestionService, RESPONSE_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# 분위수 계산에 사용하는 최근 flush 기록 수
+LATENCY_WINDOW = 1000
+
+
+class _PendingSave:
+    """아직 커밋되지 않은 한 세션의 병합된 응답과 이를 기다리는 요청들"""
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.uid: Optional[str] = None
+        # (대기 중인 요청, 버퍼에 넣은 시각)
+        self.waiters: List[Tuple[asyncio.Future, float]] = []
+
+
+class ResponseWriteBuffer:
+    """응답 저장 그룹 커밋 버퍼 (write-behind, 워커별)
+
+    save 요청을 바로 커밋하지 않고 세션별로 모아 두었다가 flush_interval_ms마다 또는
+    max_items개 세션이 모이면 한 트랜잭션에서 저장하고 커밋 한 번(fsync 한 번)으로 끝냅니다.
+    같은 세션에 여러 번 저장하면 필드별로 마지막에 보낸 값이 남으므로 순서대로 하나씩
+    저장한 것과 결과가 같고, 배치에는 어느 요청이든 보낸 컬럼만 씁니다.
+
+    submit은 해당 배치가 커밋된 뒤에야 반환하므로 응답을 받은 저장은 항상 DB에 있습니다.
+    대신 요청 지연이 최대 flush_interval_ms만큼 늘어납니다. flush_now로 넣은 저장은 기다리지 않고
+    바로 flush하므로(같은 큐를 거쳐 순서는 유지) 그룹 커밋 없이도 PATCH 병합에 쓸 수 있습니다.
+
+    병합은 워커 프로세스 안에서만 이뤄지므로 다른 워커로 간 같은 세션의 수정은 각자 씁니다.
+    """
+
+    def __init__(self, flush_interval_ms: int = 10, max_items: int = 100):
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_items = max_items
+        self._pending: Dict[str, _PendingSave] = {}
+        # 이벤트는 이벤트 루프에 묶이므로 start()에서 만듦
+        self._has_pending: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.submitted = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.sessions_flushed = 0
+        self.rows_written = 0
+        self.failed_saves = 0
+        self.max_batch_size = 0
+        self.flush_seconds = 0.0
+        self.wait_seconds = 0.0
+        self._flush_ms: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._batch_sizes: Deque[int] = deque(maxlen=LATENCY_WINDOW)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def submit(
+        self, session_id: str, responses: UserResponseData, uid: Optional[str] = None, flush_now: bool = False
+    ) -> Optional[UserResponse]:
+        """응답을 버퍼에 넣고 커밋될 때까지 대기 (None인 필드는 기존 값 유지, 세션이 없으면 None)"""
+        return await self.submit_fields(
+            session_id, responses.model_dump(include=set(RESPONSE_FIELDS), exclude_none=True), uid, flush_now
+        )
+
+    async def submit_fields(
+        self, session_id: str, fields: Dict[str, Any], uid: Optional[str] = None, flush_now: bool = False
+    ) -> Optional[UserResponse]:
+        """지정한 필드 값만 버퍼에 넣고 커밋될 때까지 대기 (None 값은 해당 필드를 지움)
+
+        flush_now면 flush_interval을 기다리지 않고 모인 저장과 함께 바로 flush합니다.
+        """
+        pending = self._pending.get(session_id)
+        if pending is None:
+            pending = self._pending[session_id] = _PendingSave()
+        else:
+            self.coalesced += 1
+        pending.fields.update(fields)
+        if uid is not None:
+            pending.uid = uid
+
+        waiter = asyncio.get_running_loop().create_future()
+        pending.waiters.append((waiter, time.perf_counter()))
+        self.submitted += 1
+        self._has_pending.set()
+        if flush_now or len(self._pending) >= self.max_items:
+            self._full.set()
+        return await waiter
+
+    async def flush(self) -> int:
+        """모인 저장을 한 트랜잭션으로 커밋하고 기다리는 요청에 결과 전달 (저장한 세션 수)"""
+        batch, self._pending = self._pending, {}
+        self._has_pending.clear()
+        self._full.clear()
+        if not batch:
+            return 0
+
+        start_time = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                results = await db.run_sync(
+                    lambda session: QuestionService(session).save_user_responses_batch(
+                        {session_id: (pending.fields, pending.uid) for session_id, pending in batch.items()}
+                    )
+                )
+        except Exception as e:
+            logger.error(f"Response write buffer flush failed: {str(e)}")
+            results = {session_id: Exception(f"응답 저장 실패: {str(e)}") for session_id in batch}
+
+        finished_at = time.perf_counter()
+        flush_seconds = finished_at - start_time
+        self.flushes += 1
+        self.flush_seconds += flush_seconds
+        self.sessions_flushed += len(batch)
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+        self._flush_ms.append(flush_seconds * 1000)
+        self._batch_sizes.append(len(batch))
+
+        for session_id, pending in batch.items():
+            result = results.get(session_id)
+            if isinstance(result, Exception):
+                self.failed_saves += 1
+            elif result is not None:
+                self.rows_written += 1
+                recent_writes.mark(session_id=session_id, uid=result.uid)
+                cohort_index.mark_dirty(result.uid)
+            for waiter, submitted_at in pending.waiters:
+                self.wait_seconds += finished_at - submitted_at
+                # 요청이 먼저 취소됐으면 결과를 넣을 수 없음 (저장은 이미 끝남)
+                if waiter.done():
+                    continue
+                if isinstance(result, Exception):
+                    waiter.set_exception(result)
+                else:
+                    waiter.set_result(result)
+        return len(batch)
+
+    async def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._has_pending = asyncio.Event()
+            self._full = asyncio.Event()
+            if self._pending:
+                self._has_pending.set()
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """남은 저장을 마저 커밋한 뒤 flush 루프 종료
+
+        진행 중인 flush를 취소하면 기다리는 요청이 결과를 받지 못하므로 cancel 대신 루프가 스스로 끝나게 합니다.
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._has_pending.set()
+            self._full.set()
+            await self._task
+            self._task = None
+
+    async def _flush_loop(self):
+        while True:
+            await self._has_pending.wait()
+            # 첫 저장이 들어온 뒤 flush_interval이 지나거나 max_items가 차면 flush
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Response write buffer flush failed: {e}")
+            if self._stopping and not self._pending:
+                return
+
+    @staticmethod
+    def _percentile(values: List[float], q: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> Dict[str, Any]:
+        flush_ms = list(self._flush_ms)
+        return {
+            "enabled": self.running,
+            "flush_interval_ms": round(self.flush_interval * 1000, 3),
+            "max_items": self.max_items,
+            "pending_sessions": len(self._pending),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failed_saves": self.failed_saves,
+            "avg_batch_size": round(self.sessions_flushed / self.flushes, 2) if self.flushes else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "p50_batch_size": self._percentile(list(self._batch_sizes), 0.5),
+            "avg_flush_ms": round(self.flush_seconds / self.flushes * 1000, 3) if self.flushes else 0.0,
+            "p50_flush_ms": round(self._percentile(flush_ms, 0.5), 3),
+            "p99_flush_ms": round(self._percentile(flush_ms, 0.99), 3),
+            # 버퍼에 들어간 뒤 커밋될 때까지 요청이 기다린 평균 시간 (flush 대기 + flush)
+            "avg_ack_ms": round(self.wait_seconds / self.submitted * 1000, 3) if self.submitted else 0.0
+        }
+
+
+# lifespan에서 항상 시작하는 워커별 버퍼 (PATCH는 항상 병합, 전체 저장은 RESPONSE_WRITE_BUFFER_ENABLED일 때만 그룹 커밋 대기)
+response_write_buffer = ResponseWriteBuffer(
+    flush_interval_ms=settings.RESPONSE_WRITE_BUFFER_FLUSH_MS,
+    max_items=settings.RESPONSE_WRITE_BUFFER_MAX_ITEMS
+)
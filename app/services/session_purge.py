@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select, delete, exists, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, QuestionSession, QuestionSessionArchive, UserResponse, run_with_session
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = ("session_id", "uid", "device_id", "created_at", "completed_at", "status")
+
+
+def abandoned_sessions(cutoff: datetime):
+    """cutoff 이전에 만들어져 응답도 연결도 없이 in_progress로 남은 세션 조건
+    (ix_question_sessions_abandoned_created_at 부분 인덱스로 찾음)"""
+    return select(QuestionSession.session_id).where(
+        QuestionSession.status == "in_progress",
+        QuestionSession.uid.is_(None),
+        QuestionSession.created_at < cutoff,
+        ~exists().where(UserResponse.session_id == QuestionSession.session_id)
+    )
+
+
+class SessionPurge:
+    """방치된 익명 세션 정리
+
+    batch_size개씩 잘라 트랜잭션마다 커밋하므로 잠금은 짧게 유지되고, 후보 행은
+    FOR UPDATE SKIP LOCKED로 잡아 다른 워커/CLI가 동시에 돌아도 같은 행을 두고 기다리지 않습니다.
+    archive=True면 삭제한 행을 같은 문장에서 question_sessions_archive에 넣습니다.
+
+    응답 저장은 세션 행을 FOR KEY SHARE로 잡으므로, 저장 중인 세션은 SKIP LOCKED로 건너뛰고
+    정리가 먼저 잠근 세션에 대한 저장은 삭제 커밋 후 세션 없음(0행)으로 끝나 고아 응답이 생기지 않습니다.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def count(self, cutoff: datetime) -> int:
+        """정리 대상 세션 수 (dry run용)"""
+        return self.db.scalar(select(func.count()).select_from(abandoned_sessions(cutoff).subquery()))
+
+    def purge_batch(self, cutoff: datetime, batch_size: int, archive: bool = False) -> int:
+        """대상 세션을 최대 batch_size개 삭제(또는 보관)하고 커밋 (처리한 행 수)"""
+        try:
+            candidates = (
+                abandoned_sessions(cutoff)
+                .order_by(QuestionSession.created_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+                .cte("candidates")
+            )
+            deleted = delete(QuestionSession).where(
+                QuestionSession.session_id.in_(select(candidates.c.session_id))
+            )
+            if archive:
+                deleted = deleted.returning(*(getattr(QuestionSession, column) for column in ARCHIVE_COLUMNS)).cte("deleted")
+                stmt = (
+                    insert(QuestionSessionArchive)
+                    .from_select(ARCHIVE_COLUMNS, select(*(deleted.c[column] for column in ARCHIVE_COLUMNS)))
+                )
+                # 이미 보관된 session_id여도 삭제한 행은 모두 보관되도록 덮어씀 (RETURNING 수 = 삭제 수)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[QuestionSessionArchive.session_id],
+                    set_={
+                        **{column: stmt.excluded[column] for column in ARCHIVE_COLUMNS if column != "session_id"},
+                        "archived_at": func.timezone("UTC", func.now())
+                    }
+                ).returning(QuestionSessionArchive.session_id)
+            else:
+                stmt = deleted.returning(QuestionSession.session_id)
+
+            purged = len(self.db.execute(stmt).all())
+            self.db.commit()
+            return purged
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Session purge failed: {str(e)}")
+            raise Exception(f"세션 정리 실패: {str(e)}")
+
+    def run(self, max_age: timedelta, batch_size: int, archive: bool = False, max_batches: Optional[int] = None) -> Dict[str, Any]:
+        """대상이 없을 때까지 배치 반복 (처리한 행 수 보고)"""
+        start_time = time.perf_counter()
+        cutoff = datetime.utcnow() - max_age
+        purged = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            batch_purged = self.purge_batch(cutoff, batch_size, archive)
+            batches += 1
+            purged += batch_purged
+            if batch_purged < batch_size:
+                break
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        logger.info(f"Session purge: {purged} abandoned sessions {'archived' if archive else 'deleted'} in {batches} batches ({elapsed_ms:.1f}ms)")
+        return {
+            "purged": purged,
+            "batches": batches,
+            "archived": archive,
+            "cutoff": cutoff,
+            "elapsed_ms": round(elapsed_ms, 1)
+        }
+
+
+class SessionPurger:
+    """워커마다 주기적으로 방치된 세션 정리 (SKIP LOCKED로 워커끼리 행을 나눠 처리)"""
+
+    def __init__(self, interval: int = 3600, max_age_hours: int = 168, batch_size: int = 1000, archive: bool = False):
+        self.interval = interval
+        self.max_age = timedelta(hours=max_age_hours)
+        self.batch_size = batch_size
+        self.archive = archive
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.rows_purged = 0
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    def _run(self, db: Session) -> Dict[str, Any]:
+        return SessionPurge(db).run(self.max_age, self.batch_size, self.archive)
+
+    async def run_once(self) -> Dict[str, Any]:
+        # CLI와 같은 배치 루프를 워커 스레드에서 실행 (배치마다 커밋하므로 잠금은 짧고 이벤트 루프는 막지 않음)
+        result = await asyncio.to_thread(run_with_session, SessionLocal, self._run)
+        self.runs += 1
+        self.rows_purged += result["purged"]
+        self.last_run = result
+        return self.last_run
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._purge_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _purge_loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning(f"Session purge failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "max_age_hours": self.max_age.total_seconds() / 3600,
+            "batch_size": self.batch_size,
+            "archive": self.archive,
+            "runs": self.runs,
+            "rows_purged": self.rows_purged,
+            "last_run": self.last_run,
+            "background_purge": self._task is not None and not self._task.done()
+        }
+
+
+# SESSION_PURGE_ENABLED일 때 lifespan에서 시작하는 워커별 정리 작업
+session_purger = SessionPurger(
+    interval=settings.SESSION_PURGE_INTERVAL,
+    max_age_hours=settings.SESSION_PURGE_MAX_AGE_HOURS,
+    batch_size=settings.SESSION_PURGE_BATCH_SIZE,
+    archive=settings.SESSION_PURGE_ARCHIVE
+)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for Google's securetoken x509 key server
+
+Serves a freshly generated signing certificate in the same format as
+https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com
+and prints ID tokens signed with it, so token verification can be tested offline.
+
+Usage:
+    python scripts/local_key_server.py --project-id demo-project --uid test-user
+    FIREBASE_CERTS_URL=http://127.0.0.1:8765/certs FIREBASE_PROJECT_ID=demo-project python main.py
+"""
+
+import argparse
+import datetime
+import json
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import jwt
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+
+def generate_signing_key():
+    """RSA 키와 자체 서명 인증서 생성"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken.local")])
+    now = datetime.datetime.utcnow()
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(private_key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(private_key, hashes.SHA256())
+    )
+    return private_key, certificate.public_bytes(serialization.Encoding.PEM).decode("utf-8")
+
+
+def mint_id_token(private_key, kid: str, project_id: str, uid: str, email: str = None, lifetime: int = 3600) -> str:
+    """Firebase ID 토큰과 같은 클레임을 가진 테스트 토큰 발급"""
+    now = int(time.time())
+    claims = {
+        "iss": f"https://securetoken.google.com/{project_id}",
+        "aud": project_id,
+        "auth_time": now,
+        "user_id": uid,
+        "sub": uid,
+        "iat": now,
+        "exp": now + lifetime,
+        "email": email,
+        "email_verified": True,
+        "firebase": {"sign_in_provider": "password"}
+    }
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Firebase public key server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--project-id", default="demo-project")
+    parser.add_argument("--uid", default="test-user")
+    parser.add_argument("--email", default="test@auvra.com")
+    parser.add_argument("--max-age", type=int, default=600, help="Cache-Control max-age (seconds)")
+    args = parser.parse_args()
+
+    kid = uuid.uuid4().hex
+    private_key, certificate = generate_signing_key()
+    body = json.dumps({kid: certificate}).encode("utf-8")
+
+    class CertsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+            self.send_header("Cache-Control", f"public, max-age={args.max_age}, must-revalidate, no-transform")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    print(f"🔑 Serving certs at http://{args.host}:{args.port}/certs (kid={kid})")
+    print(f"   FIREBASE_CERTS_URL=http://{args.host}:{args.port}/certs FIREBASE_PROJECT_ID={args.project_id}")
+    print("\nID token:")
+    print(mint_id_token(private_key, kid, args.project_id, args.uid, args.email))
+
+    HTTPServer((args.host, args.port), CertsHandler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
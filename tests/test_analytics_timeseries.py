@@ -0,0 +1,127 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.core.database import AnalyticsTimeseries
+from app.services.analytics_timeseries import (
+    MAX_TIMESERIES_POINTS, AnalyticsTimeSeries, next_bucket, to_utc, truncate_bucket
+)
+
+# 시계열 합산은 SQL에서 하므로 실제 DB 테스트는 TEST_DATABASE_URL이 있을 때만 (트랜잭션은 항상 롤백)
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+STAMP = datetime(2026, 3, 18, 13, 45, 12)  # 수요일
+
+
+@pytest.mark.parametrize(
+    "bucket,expected",
+    [
+        ("hour", datetime(2026, 3, 18, 13)),
+        ("day", datetime(2026, 3, 18)),
+        ("week", datetime(2026, 3, 16)),
+        ("month", datetime(2026, 3, 1)),
+    ],
+)
+def test_truncate_bucket(bucket, expected):
+    assert truncate_bucket(STAMP, bucket) == expected
+
+
+def test_next_bucket_rolls_over_month_and_year():
+    assert next_bucket(datetime(2026, 1, 31, 23), "hour") == datetime(2026, 2, 1, 0)
+    assert next_bucket(datetime(2026, 3, 16), "week") == datetime(2026, 3, 23)
+    assert next_bucket(datetime(2026, 11, 1), "month") == datetime(2026, 12, 1)
+    assert next_bucket(datetime(2026, 12, 1), "month") == datetime(2027, 1, 1)
+
+
+def test_to_utc():
+    kst = timezone(timedelta(hours=9))
+    assert to_utc(datetime(2026, 3, 18, 9, tzinfo=kst)) == datetime(2026, 3, 18, 0)
+    assert to_utc(STAMP) == STAMP
+
+
+def test_bucket_starts_cover_partial_range():
+    starts = AnalyticsTimeSeries(None).bucket_starts(datetime(2026, 3, 18, 12), datetime(2026, 3, 21), "day")
+    assert starts == [datetime(2026, 3, 18), datetime(2026, 3, 19), datetime(2026, 3, 20)]
+
+
+def test_bucket_starts_limit():
+    with pytest.raises(ValueError, match="Range too large"):
+        AnalyticsTimeSeries(None).bucket_starts(datetime(2000, 1, 1), datetime(2026, 1, 1), "hour")
+    assert len(AnalyticsTimeSeries(None).bucket_starts(datetime(2026, 1, 1), datetime(2026, 2, 1), "hour")) < MAX_TIMESERIES_POINTS
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class _FakeSession:
+    """GROUP BY 결과 행을 돌려주고 실행한 문장을 기록"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        return _FakeResult(self.rows)
+
+
+def test_query_fills_missing_buckets_with_zero():
+    db = _FakeSession([("sessions_created", datetime(2026, 3, 19), 7)])
+    result = AnalyticsTimeSeries(db).query(datetime(2026, 3, 18), datetime(2026, 3, 21), "day", ["sessions_created", "merges"])
+    assert result["series"] == {"sessions_created": [0, 7, 0], "merges": [0, 0, 0]}
+
+    # 샤드 행은 SQL에서 구간별로 합산됨
+    sql = str(db.statements[0].compile(compile_kwargs={"literal_binds": True}))
+    assert "sum(analytics_timeseries.count)" in sql
+    assert "GROUP BY analytics_timeseries.metric" in sql
+    assert "shard" not in sql.split("GROUP BY")[1]
+
+
+@pytest.mark.parametrize(
+    "kwargs,message",
+    [
+        ({"bucket": "year"}, "Unknown bucket"),
+        ({"metrics": ["bogus"]}, "Unknown metrics"),
+        ({"start": datetime(2026, 3, 21)}, "start must be before end"),
+    ],
+)
+def test_query_rejects_bad_arguments(kwargs, message):
+    arguments = {"start": datetime(2026, 3, 18), "end": datetime(2026, 3, 21), "bucket": "day", "metrics": None}
+    arguments.update(kwargs)
+    with pytest.raises(ValueError, match=message):
+        AnalyticsTimeSeries(_FakeSession([])).query(**arguments)
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+def test_query_sums_shards_per_bucket():
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            db = Session(bind=connection)
+            metric = "merges"
+            start = datetime(1999, 1, 4)  # 월요일, 실제 데이터와 겹치지 않는 과거 구간
+            db.execute(insert(AnalyticsTimeseries), [
+                {"metric": metric, "granularity": "day", "bucket_start": datetime(1999, 1, 4), "shard": 0, "count": 2},
+                {"metric": metric, "granularity": "day", "bucket_start": datetime(1999, 1, 4), "shard": 5, "count": 3},
+                {"metric": metric, "granularity": "day", "bucket_start": datetime(1999, 1, 6), "shard": 7, "count": 4},
+                {"metric": metric, "granularity": "day", "bucket_start": datetime(1999, 1, 12), "shard": 1, "count": 1},
+            ])
+            timeseries = AnalyticsTimeSeries(db)
+
+            daily = timeseries.query(start, datetime(1999, 1, 7), "day", [metric])
+            assert daily["series"][metric] == [5, 0, 4]
+
+            weekly = timeseries.query(start, datetime(1999, 1, 18), "week", [metric])
+            assert weekly["series"][metric] == [9, 1]
+        finally:
+            transaction.rollback()
+    engine.dispose()
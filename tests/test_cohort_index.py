@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.cohort_index import INDEXED_FIELDS, CohortIndex
+
+PCOS = {"field": "diagnosed_conditions", "value": "PCOS"}
+BLOATING = {"field": "body_concerns", "value": "Bloating"}
+MOOD = {"field": "mental_health_concerns", "value": "Mood swings"}
+
+USERS = {
+    "u1": {("diagnosed_conditions", "PCOS"), ("body_concerns", "Bloating")},
+    "u2": {("diagnosed_conditions", "PCOS"), ("mental_health_concerns", "Mood swings")},
+    "u3": {("body_concerns", "Bloating")},
+    "u4": set(),
+}
+
+
+def build(users):
+    """DB 없이 증분 변경 적용 경로로 인덱스 구성"""
+    index = CohortIndex()
+    index._apply_changes({"tokens_by_uid": users, "watermark": None})
+    return index
+
+
+def members(index, expression):
+    bitmap = index._evaluate(expression)
+    return {uid for uid, ordinal in index._ordinals.items() if bitmap >> ordinal & 1}
+
+
+@pytest.mark.parametrize(
+    "expression,expected",
+    [
+        (PCOS, {"u1", "u2"}),
+        ({"and": [PCOS, BLOATING]}, {"u1"}),
+        ({"or": [BLOATING, MOOD]}, {"u1", "u2", "u3"}),
+        ({"not": PCOS}, {"u3", "u4"}),
+        ({"and": [PCOS, {"not": MOOD}]}, {"u1"}),
+        ({"not": {"or": [PCOS, BLOATING]}}, {"u4"}),
+    ],
+)
+def test_evaluates_expressions(expression, expected):
+    assert members(build(USERS), expression) == expected
+
+
+def test_bitmap_counts_match_brute_force():
+    users = {
+        f"u{i}": {("body_concerns", "Bloating")} if i % 3 == 0 else {("diagnosed_conditions", "PCOS")} if i % 3 == 1 else set()
+        for i in range(200)
+    }
+    index = build(users)
+    assert index._evaluate(BLOATING).bit_count() == sum(1 for tokens in users.values() if ("body_concerns", "Bloating") in tokens)
+    assert index._evaluate({"not": BLOATING}).bit_count() == 200 - index._evaluate(BLOATING).bit_count()
+    assert index._universe.bit_count() == 200
+
+
+def test_changes_replace_user_bits():
+    index = build(USERS)
+    index._apply_changes({"tokens_by_uid": {"u1": {("mental_health_concerns", "Mood swings")}}, "watermark": None})
+    assert members(index, PCOS) == {"u2"}
+    assert members(index, MOOD) == {"u1", "u2"}
+
+
+def test_user_without_responses_leaves_universe():
+    index = build(USERS)
+    index._apply_changes({"tokens_by_uid": {"u3": None}, "watermark": None})
+    assert members(index, BLOATING) == {"u1"}
+    # 응답이 모두 사라진 사용자는 NOT 결과에도 포함되지 않음
+    assert members(index, {"not": PCOS}) == {"u4"}
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        {"field": "body_concerns", "value": "Unknown"},
+        {"field": "unknown_field", "value": "Bloating"},
+        {"and": []},
+        {"and": [PCOS], "or": [BLOATING]},
+        {},
+    ],
+)
+def test_rejects_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        build(USERS)._evaluate(expression)
+
+
+def test_to_bitmap_sets_each_ordinal():
+    assert CohortIndex._to_bitmap([0, 3, 9], 2) == (1 << 0) | (1 << 3) | (1 << 9)
+
+
+def test_row_tokens_skip_free_text_answers():
+    row = SimpleNamespace(**{field: None for field in INDEXED_FIELDS})
+    row.body_concerns = ["Bloating", "Nausea"]
+    row.top_concern = "Mood swings"
+    row.diagnosed_conditions = ["PCOS", "Others: something else"]
+    assert CohortIndex._row_tokens(row) == {
+        ("body_concerns", "Bloating"), ("body_concerns", "Nausea"),
+        ("top_concern", "Mood swings"), ("diagnosed_conditions", "PCOS"),
+    }
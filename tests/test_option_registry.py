@@ -0,0 +1,72 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from app.core.database import OptionCodes
+from app.core.option_registry import CODED_ARRAY_FIELDS, OPTION_REGISTRY, OptionSet
+
+MIGRATION_0005 = Path(__file__).resolve().parent.parent / "alembic" / "versions" / "005_encode_options_as_smallint_codes.py"
+
+
+@pytest.mark.parametrize("field", list(OPTION_REGISTRY))
+def test_encode_decode_round_trip(field):
+    option_set = OPTION_REGISTRY[field]
+    labels = option_set.labels
+    codes = option_set.encode(labels)
+    assert codes == sorted(option_set.label_by_code)
+    assert option_set.decode(codes) == labels
+
+
+def test_none_passes_through():
+    option_set = OPTION_REGISTRY["period_concerns"]
+    assert option_set.encode(None) is None
+    assert option_set.decode(None) is None
+    assert option_set.encode([]) == []
+
+
+def test_keeps_selection_order():
+    option_set = OPTION_REGISTRY["period_concerns"]
+    assert option_set.encode(["Heavy periods", "Irregular Periods"]) == [4, 1]
+    assert option_set.decode([4, 1]) == ["Heavy periods", "Irregular Periods"]
+
+
+def test_rejects_unknown_label_and_code():
+    option_set = OPTION_REGISTRY["body_concerns"]
+    with pytest.raises(ValueError, match="Unknown body_concerns option"):
+        option_set.encode(["Bloating", "Bogus"])
+    with pytest.raises(ValueError, match="Unknown body_concerns code"):
+        option_set.decode([1, 99])
+
+
+def test_rejects_duplicate_label():
+    with pytest.raises(ValueError, match="Duplicate option label"):
+        OptionSet("example", {1: "A", 2: "A"})
+
+
+def test_labels_follow_code_order():
+    option_set = OptionSet("example", {3: "C", 1: "A", 2: "B"})
+    assert option_set.labels == ["A", "B", "C"]
+    assert "B" in option_set and "D" not in option_set
+
+
+@pytest.mark.parametrize("field", CODED_ARRAY_FIELDS)
+def test_column_type_round_trip(field):
+    column_type = OptionCodes(field)
+    labels = OPTION_REGISTRY[field].labels[:2]
+    stored = column_type.process_bind_param(labels, None)
+    assert all(isinstance(code, int) for code in stored)
+    assert column_type.process_result_value(stored, None) == labels
+    assert column_type.process_bind_param(None, None) is None
+
+
+def test_migration_codes_are_never_reassigned():
+    # 0005가 기존 데이터를 변환할 때 쓴 코드는 레지스트리에서도 같은 라벨을 가리켜야 함
+    spec = importlib.util.spec_from_file_location("migration_0005", MIGRATION_0005)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    assert set(migration.CODED_ARRAY_FIELDS) == set(CODED_ARRAY_FIELDS)
+    for field, codes in migration.OPTION_CODES.items():
+        for code, label in codes.items():
+            assert OPTION_REGISTRY[field].label_by_code.get(code) == label
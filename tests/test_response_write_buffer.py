@@ -0,0 +1,166 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.question_models import UserResponseData
+from app.services import response_write_buffer as buffer_module
+from app.services.response_write_buffer import ResponseWriteBuffer
+
+
+class _FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def run_sync(self, fn):
+        return fn(None)
+
+
+class _FakeQuestionService:
+    """save_user_responses_batch에 들어온 배치를 기록 (missing 세션은 None, fail이면 예외)"""
+
+    batches = []
+    missing = set()
+    fail = False
+
+    def __init__(self, db):
+        pass
+
+    def save_user_responses_batch(self, entries):
+        type(self).batches.append(entries)
+        if type(self).fail:
+            raise RuntimeError("database is down")
+        return {
+            session_id: None if session_id in type(self).missing else SimpleNamespace(id=index, uid=uid, **values)
+            for index, (session_id, (values, uid)) in enumerate(sorted(entries.items()))
+        }
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    _FakeQuestionService.batches = []
+    _FakeQuestionService.missing = set()
+    _FakeQuestionService.fail = False
+    monkeypatch.setattr(buffer_module, "AsyncSessionLocal", _FakeSession)
+    monkeypatch.setattr(buffer_module, "QuestionService", _FakeQuestionService)
+    return _FakeQuestionService
+
+
+@pytest.mark.asyncio
+async def test_coalesces_saves_per_session(fake_db):
+    buffer = ResponseWriteBuffer(flush_interval_ms=20, max_items=100)
+    await buffer.start()
+    try:
+        results = await asyncio.gather(
+            buffer.submit_fields("session_a", {"age": 20}),
+            buffer.submit_fields("session_a", {"age": 21, "name": "Kim"}),
+            buffer.submit("session_a", UserResponseData(period_description="Regular"), uid="u1"),
+            buffer.submit_fields("session_b", {"age": 40}),
+        )
+    finally:
+        await buffer.stop()
+
+    # 한 배치, 세션별 한 항목, 필드별 마지막 값
+    assert len(fake_db.batches) == 1
+    assert fake_db.batches[0] == {
+        "session_a": ({"age": 21, "name": "Kim", "period_description": "Regular"}, "u1"),
+        "session_b": ({"age": 40}, None),
+    }
+    assert results[0] is results[1] is results[2]
+    assert results[3].age == 40
+
+    stats = buffer.stats()
+    assert (stats["submitted"], stats["coalesced"], stats["flushes"], stats["rows_written"]) == (4, 2, 1, 2)
+
+
+@pytest.mark.asyncio
+async def test_none_clears_a_field_but_unset_fields_are_not_sent(fake_db):
+    buffer = ResponseWriteBuffer(flush_interval_ms=5)
+    await buffer.start()
+    try:
+        await asyncio.gather(
+            buffer.submit("session_a", UserResponseData(age=30)),
+            buffer.submit_fields("session_a", {"name": None}),
+        )
+    finally:
+        await buffer.stop()
+    assert fake_db.batches[0] == {"session_a": ({"age": 30, "name": None}, None)}
+
+
+@pytest.mark.asyncio
+async def test_max_items_flushes_before_interval(fake_db):
+    buffer = ResponseWriteBuffer(flush_interval_ms=10000, max_items=2)
+    await buffer.start()
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(buffer.submit_fields("session_a", {"age": 1}), buffer.submit_fields("session_b", {"age": 2})),
+            timeout=2
+        )
+    finally:
+        await buffer.stop()
+    assert len(fake_db.batches) == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_now_does_not_wait_for_interval(fake_db):
+    buffer = ResponseWriteBuffer(flush_interval_ms=10000)
+    await buffer.start()
+    try:
+        patch = asyncio.create_task(buffer.submit_fields("session_a", {"age": 1}))
+        await asyncio.sleep(0)
+        saved = await asyncio.wait_for(buffer.submit_fields("session_a", {"age": 2}, flush_now=True), timeout=2)
+        await patch
+    finally:
+        await buffer.stop()
+    # 먼저 들어온 PATCH와 같은 배치에서 뒤의 값이 남음
+    assert saved.age == 2
+    assert fake_db.batches == [{"session_a": ({"age": 2}, None)}]
+
+
+@pytest.mark.asyncio
+async def test_missing_session_and_failed_flush(fake_db):
+    buffer = ResponseWriteBuffer(flush_interval_ms=5)
+    await buffer.start()
+    try:
+        fake_db.missing = {"session_gone"}
+        assert await buffer.submit_fields("session_gone", {"age": 1}) is None
+
+        fake_db.fail = True
+        results = await asyncio.gather(
+            buffer.submit_fields("session_a", {"age": 1}),
+            buffer.submit_fields("session_b", {"age": 2}),
+            return_exceptions=True
+        )
+    finally:
+        await buffer.stop()
+    assert all(isinstance(result, Exception) and "응답 저장 실패" in str(result) for result in results)
+    assert buffer.stats()["failed_saves"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_saves(fake_db):
+    buffer = ResponseWriteBuffer(flush_interval_ms=10000)
+    await buffer.start()
+    pending = asyncio.create_task(buffer.submit_fields("session_a", {"age": 1}))
+    await asyncio.sleep(0)
+    await buffer.stop()
+    assert (await pending).age == 1
+    assert not buffer.running
+
+
+def test_restarts_on_a_new_event_loop(fake_db):
+    buffer = ResponseWriteBuffer(flush_interval_ms=5)
+
+    async def cycle(age):
+        await buffer.start()
+        try:
+            return await buffer.submit_fields("session_a", {"age": age})
+        finally:
+            await buffer.stop()
+
+    # 이벤트는 start()에서 만들어지므로 lifespan을 다시 시작해도 이전 루프에 묶이지 않음
+    assert asyncio.run(cycle(1)).age == 1
+    assert asyncio.run(cycle(2)).age == 2
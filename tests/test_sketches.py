@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from app.core.sketches import HyperLogLog, TDigest
+from app.services.analytics_sketches import _age_cdf, _age_quantile
+
+
+def test_hll_estimate_within_error():
+    sketch = HyperLogLog()
+    sketch.update(f"user-{i}" for i in range(50000))
+    assert abs(sketch.estimate() - 50000) <= 3 * sketch.relative_error * 50000
+
+
+def test_hll_ignores_duplicates():
+    sketch = HyperLogLog()
+    sketch.update(f"user-{i}" for i in range(1000))
+    estimate = sketch.estimate()
+    sketch.update(f"user-{i}" for i in range(1000))
+    assert sketch.estimate() == estimate
+    assert HyperLogLog().estimate() == 0
+
+
+def test_hll_merge_equals_single_sketch():
+    left, right, combined = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    left.update(f"user-{i}" for i in range(0, 6000))
+    right.update(f"user-{i}" for i in range(4000, 10000))
+    combined.update(f"user-{i}" for i in range(10000))
+
+    left.merge(right)
+    # 레지스터별 최댓값이므로 나눠 만든 스케치를 합친 결과는 한 번에 만든 것과 같음
+    assert np.array_equal(left.registers, combined.registers)
+    assert left.estimate() == combined.estimate()
+
+
+def test_hll_round_trip():
+    sketch = HyperLogLog(precision=12)
+    sketch.update(f"user-{i}" for i in range(3000))
+    restored = HyperLogLog.from_bytes(sketch.to_bytes())
+    assert restored.precision == 12
+    assert np.array_equal(restored.registers, sketch.registers)
+    assert restored.estimate() == sketch.estimate()
+
+
+def test_hll_rejects_mismatched_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=12).merge(HyperLogLog(precision=14))
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=3)
+
+
+def uniform_values(size=20000, seed=7):
+    return np.random.default_rng(seed).uniform(0, 100, size)
+
+
+@pytest.mark.parametrize("q", [0.01, 0.1, 0.5, 0.9, 0.99])
+def test_tdigest_quantiles(q):
+    values = uniform_values()
+    digest = TDigest()
+    digest.update(values)
+    assert digest.quantile(q) == pytest.approx(np.quantile(values, q), abs=1.0)
+    assert digest.cdf(np.quantile(values, q)) == pytest.approx(q, abs=0.01)
+
+
+def test_tdigest_merge_matches_single_digest():
+    values = uniform_values()
+    left, right = TDigest(), TDigest()
+    left.update(values[:5000])
+    right.update(values[5000:])
+    left.merge(right)
+
+    assert left.count == len(values)
+    assert left.min == values.min() and left.max == values.max()
+    # 압축으로 중심 수가 compression 수준으로 유지됨
+    assert len(left.means) <= 2 * left.compression
+    for q in (0.1, 0.5, 0.9):
+        assert left.quantile(q) == pytest.approx(np.quantile(values, q), abs=1.0)
+
+
+def test_tdigest_round_trip():
+    digest = TDigest(compression=50)
+    digest.update(uniform_values(3000))
+    restored = TDigest.from_bytes(digest.to_bytes())
+    assert restored.compression == 50
+    assert restored.count == digest.count
+    assert (restored.min, restored.max) == (digest.min, digest.max)
+    for q in (0.0, 0.25, 0.5, 0.75, 1.0):
+        assert restored.quantile(q) == digest.quantile(q)
+
+
+def test_tdigest_empty():
+    digest = TDigest()
+    assert digest.quantile(0.5) is None
+    assert digest.cdf(10) == 0.0
+    assert digest.count == 0
+    assert TDigest.from_bytes(digest.to_bytes()).quantile(0.5) is None
+
+
+def test_age_quantile_subtracts_removed_ages():
+    ages = np.arange(20, 61, dtype=float).repeat(50)
+    added, removed = TDigest(), TDigest()
+    added.update(ages)
+    removed.update(ages[ages < 30])
+    remaining = ages[ages >= 30]
+
+    assert _age_quantile(added, removed, 0.5) == pytest.approx(np.median(remaining), abs=1.0)
+    assert _age_cdf(added, removed, 29) == pytest.approx(0.0, abs=0.02)
+    assert _age_quantile(added, TDigest(), 0.5) == added.quantile(0.5)
+
+
+def test_age_quantile_when_everything_removed():
+    added, removed = TDigest(), TDigest()
+    added.update([30.0, 40.0])
+    removed.update([30.0, 40.0])
+    assert _age_quantile(added, removed, 0.5) is None
+    assert _age_cdf(added, removed, 35) == 0.0
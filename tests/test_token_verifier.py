@@ -0,0 +1,87 @@
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.core.token_verifier import FirebaseTokenVerifier
+
+PROJECT_ID = "test-project"
+KID = "test-kid"
+
+
+@pytest.fixture(scope="module")
+def private_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture
+def verifier(private_key):
+    """인증서 엔드포인트 대신 테스트 공개 키를 넣어 둔 검증기 (네트워크 요청 없음)"""
+    verifier = FirebaseTokenVerifier(certs_url="http://certs.invalid", project_id=PROJECT_ID, max_workers=1)
+    now = time.time()
+    verifier._keys = {KID: private_key.public_key()}
+    verifier._keys_expire_at = now + 3600
+    # 알 수 없는 kid로 키 세트를 다시 받으러 가지 않도록 방금 갱신한 것으로 둠
+    verifier._last_refresh_at = now
+    return verifier
+
+
+def make_claims(**overrides):
+    now = int(time.time())
+    claims = {
+        "aud": PROJECT_ID,
+        "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+        "sub": "user-1",
+        "iat": now - 10,
+        "exp": now + 3600,
+        "auth_time": now - 10,
+    }
+    claims.update(overrides)
+    return claims
+
+
+def sign(private_key, claims, kid=KID, algorithm="RS256"):
+    return jwt.encode(claims, private_key, algorithm=algorithm, headers={"kid": kid})
+
+
+@pytest.mark.asyncio
+async def test_accepts_valid_token(verifier, private_key):
+    decoded = await verifier.verify(sign(private_key, make_claims()))
+    assert decoded["uid"] == "user-1"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "claims,reason",
+    [
+        pytest.param(make_claims(aud="other-project"), "Audience doesn.t match", id="wrong-aud"),
+        pytest.param(make_claims(iss="https://securetoken.google.com/other-project"), "Invalid issuer", id="wrong-iss"),
+        pytest.param(make_claims(iat=int(time.time()) - 7200, exp=int(time.time()) - 3600), "Signature has expired", id="expired"),
+        pytest.param(make_claims(auth_time=int(time.time()) + 3600), "auth_time claim in the future", id="future-auth-time"),
+    ],
+)
+async def test_rejects_invalid_claims(verifier, private_key, claims, reason):
+    with pytest.raises(Exception, match=f"Invalid Firebase token: .*{reason}"):
+        await verifier.verify(sign(private_key, claims))
+
+
+@pytest.mark.asyncio
+async def test_rejects_unknown_kid(verifier, private_key):
+    with pytest.raises(Exception, match="No public key found for kid"):
+        await verifier.verify(sign(private_key, make_claims(), kid="unknown-kid"))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "algorithm,key",
+    [
+        pytest.param("HS256", "shared-secret", id="HS256"),
+        pytest.param("none", None, id="none"),
+        pytest.param("RS512", "private", id="RS512"),
+    ],
+)
+async def test_rejects_non_rs256_alg(verifier, private_key, algorithm, key):
+    token = sign(private_key if key == "private" else key, make_claims(), algorithm=algorithm)
+    with pytest.raises(Exception, match="Invalid Firebase token: The specified alg value is not allowed"):
+        await verifier.verify(token)